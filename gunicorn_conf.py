@@ -0,0 +1,19 @@
+"""
+Gunicorn configuration for running the Hotel Booking AI Agent in production.
+
+Usage:
+    gunicorn -c gunicorn_conf.py src.app:app
+"""
+import multiprocessing
+import os
+
+# Server socket
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# Worker processes
+workers = int(os.getenv("UVICORN_WORKERS", str(2 * multiprocessing.cpu_count() + 1)))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Timeouts
+keepalive = 5
+timeout = 60
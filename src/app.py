@@ -3,25 +3,144 @@ FastAPI application for the Hotel Booking AI Agent.
 """
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import List, Optional
+import asyncio
+import gzip
+import anyio
+import httpx
+import orjson
 import uvicorn
 from uuid import UUID
+from redis.asyncio import ConnectionPool, Redis
+from starlette.datastructures import Headers
 
-from .config import DEBUG, HOTEL_CONFIG, RESERVATIONS_FILE
-from .models.booking import Booking, BookingModification, BookingCancellation
+from .config import (
+    ANYIO_THREADS,
+    DEBUG,
+    HOTEL_CONFIG,
+    HOTEL_CONFIG_JSON,
+    INTENT_CACHE_SIZE,
+    INTENT_CACHE_TTL,
+    KB_TOP_K,
+    MAX_INFLIGHT_MESSAGES,
+    RESERVATIONS_FILE,
+    WAL_COMPACT_EVERY,
+    WAL_FLUSH_INTERVAL_MS,
+    REDIS_URL,
+    REDIS_MAX_CONNECTIONS,
+    CONVERSATION_TTL
+)
+from .models.booking import (
+    Booking,
+    BookingCreate,
+    BookingUpdate,
+    BookingModification,
+    BookingCancellation
+)
 from .services.booking import BookingService
 from .storage.json_storage import JSONStorage
 from .llm.openai_client import OpenAIClient
+from .conversation.intent_cache import IntentCache
+from .conversation.knowledge_base import KnowledgeBase, build_chunks
 from .conversation.manager import ConversationManager
+from .conversation.state_store import RedisStateStore
 from .instagram.client import InstagramClient
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown."""
+    # Raise the threadpool cap used for sync dependencies and to_thread calls
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = ANYIO_THREADS
+    
+    redis_pool = ConnectionPool.from_url(REDIS_URL, max_connections=REDIS_MAX_CONNECTIONS)
+    redis = Redis(connection_pool=redis_pool)
+    state_store = RedisStateStore(redis, ttl=CONVERSATION_TTL)
+    intent_cache = IntentCache(INTENT_CACHE_SIZE, redis=redis, ttl=INTENT_CACHE_TTL)
+    
+    # One pooled HTTP/2 client keeps connections to OpenAI and Instagram alive
+    http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=30,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    )
+    
+    # Build long-lived dependencies once instead of per request
+    llm_client = OpenAIClient(http_client=http_client)
+    booking_storage = JSONStorage(
+        RESERVATIONS_FILE,
+        Booking,
+        compact_every=WAL_COMPACT_EVERY,
+        flush_interval=WAL_FLUSH_INTERVAL_MS / 1000
+    )
+    booking_service = BookingService(booking_storage, llm_client)
+    knowledge_base = KnowledgeBase(llm_client, build_chunks(HOTEL_CONFIG), top_k=KB_TOP_K)
+    await knowledge_base.load()
+    
+    app.state.state_store = state_store
+    app.state.llm_client = llm_client
+    app.state.booking_storage = booking_storage
+    app.state.booking_service = booking_service
+    app.state.conversation_manager = ConversationManager(
+        llm_client,
+        booking_service,
+        state_store,
+        intent_cache,
+        knowledge_base
+    )
+    app.state.instagram_client = InstagramClient(client=http_client)
+    yield
+    await booking_storage.aclose()
+    await http_client.aclose()
+    await redis_pool.disconnect()
+
 app = FastAPI(
     title="Hotel Booking AI Agent",
     description="AI-powered hotel booking system with Instagram DM integration",
     version="1.0.0",
-    debug=DEBUG
+    debug=DEBUG,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Bounds the number of messages processed concurrently by background tasks
+_PROCESS_SEMAPHORE = asyncio.Semaphore(MAX_INFLIGHT_MESSAGES)
+
+# Hotel info never changes, so compress it once instead of per request
+_HOTEL_CONFIG_GZ = gzip.compress(HOTEL_CONFIG_JSON, compresslevel=5)
+
+@lru_cache(maxsize=256)
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Check whether an Accept-Encoding header allows gzip, honouring q-values."""
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    # An explicit gzip entry wins over the wildcard
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+class _GZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves responses alone for clients refusing gzip."""
+    
+    async def __call__(self, scope, receive, send):
+        # Starlette only checks for "gzip" as a substring, so "gzip;q=0" would match
+        if scope["type"] == "http" and not _accepts_gzip(Headers(scope=scope).get("accept-encoding", "")):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -31,32 +150,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses; bodies that are already encoded pass through untouched
+app.add_middleware(_GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Dependencies
-def get_llm_client():
+def get_llm_client(request: Request) -> OpenAIClient:
     """Get LLM client instance."""
-    return OpenAIClient()
+    return request.app.state.llm_client
 
-def get_booking_storage():
+def get_booking_storage(request: Request) -> JSONStorage:
     """Get booking storage instance."""
-    return JSONStorage(RESERVATIONS_FILE, Booking)
+    return request.app.state.booking_storage
 
-def get_booking_service(
-    storage: JSONStorage = Depends(get_booking_storage),
-    llm_client: OpenAIClient = Depends(get_llm_client)
-):
+def get_booking_service(request: Request) -> BookingService:
     """Get booking service instance."""
-    return BookingService(storage, llm_client)
+    return request.app.state.booking_service
 
-def get_conversation_manager(
-    llm_client: OpenAIClient = Depends(get_llm_client),
-    booking_service: BookingService = Depends(get_booking_service)
-):
+def get_state_store(request: Request) -> RedisStateStore:
+    """Get the shared conversation state store."""
+    return request.app.state.state_store
+
+def get_conversation_manager(request: Request) -> ConversationManager:
     """Get conversation manager instance."""
-    return ConversationManager(llm_client, booking_service)
+    return request.app.state.conversation_manager
 
-def get_instagram_client():
+def get_instagram_client(request: Request) -> InstagramClient:
     """Get Instagram client instance."""
-    return InstagramClient()
+    return request.app.state.instagram_client
 
 @app.get("/")
 async def root():
@@ -95,23 +215,40 @@ async def instagram_webhook(
     if not instagram_client.verify_signature(payload, x_hub_signature):
         raise HTTPException(status_code=403, detail="Invalid signature")
     
-    # Process webhook data
-    data = await request.json()
-    message_data = await instagram_client.process_webhook(data)
+    # Parse the already-read body only once the signature checks out
+    try:
+        data = orjson.loads(payload)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    messages = await instagram_client.process_webhook(data)
     
-    if not message_data:
+    if not messages:
         return {"status": "no_action_required"}
     
-    # Process message in background
-    background_tasks.add_task(
-        process_message,
-        message_data,
-        instagram_client,
-        conversation_manager
-    )
+    # Process each sender's messages in background as a single turn
+    for message_data in coalesce_messages(messages):
+        background_tasks.add_task(
+            process_message,
+            message_data,
+            instagram_client,
+            conversation_manager
+        )
     
     return {"status": "processing"}
 
+def coalesce_messages(messages: List[dict]) -> List[dict]:
+    """Merge messages from the same sender in one webhook batch into one turn."""
+    by_sender: dict = {}
+    for message_data in messages:
+        sender_id = message_data["sender_id"]
+        if sender_id in by_sender:
+            merged = by_sender[sender_id]
+            merged["message"] = f"{merged['message']}\n{message_data['message']}"
+            merged["timestamp"] = message_data["timestamp"]
+        else:
+            by_sender[sender_id] = dict(message_data)
+    return list(by_sender.values())
+
 async def process_message(
     message_data: dict,
     instagram_client: InstagramClient,
@@ -121,25 +258,29 @@ async def process_message(
     sender_id = message_data["sender_id"]
     message = message_data["message"]
     
-    # Mark message as seen
-    await instagram_client.mark_seen(sender_id)
-    
-    # Show typing indicator
-    await instagram_client.send_typing_indicator(sender_id, True)
-    
-    try:
-        # Process message through conversation manager
-        response = await conversation_manager.handle_message(sender_id, message)
+    # Cap concurrent conversations so bursts queue here instead of flooding the LLM API
+    async with _PROCESS_SEMAPHORE:
+        # Mark message as seen and show typing indicator while the message is processed
+        ack = asyncio.gather(
+            instagram_client.mark_seen(sender_id),
+            instagram_client.send_typing_indicator(sender_id, True)
+        )
         
-        # Send response
-        await instagram_client.send_message(sender_id, response)
-    except Exception as e:
-        # Send error message
-        error_message = "I apologize, but I encountered an error processing your request. Please try again."
-        await instagram_client.send_message(sender_id, error_message)
-    finally:
-        # Turn off typing indicator
-        await instagram_client.send_typing_indicator(sender_id, False)
+        try:
+            # Process message through conversation manager
+            response = await conversation_manager.handle_message(sender_id, message)
+            
+            # Send response once the acknowledgements have gone out
+            await ack
+            await instagram_client.send_message(sender_id, response)
+        except Exception as e:
+            # Send error message
+            error_message = "I apologize, but I encountered an error processing your request. Please try again."
+            await instagram_client.send_message(sender_id, error_message)
+        finally:
+            # Turn off typing indicator
+            await ack
+            await instagram_client.send_typing_indicator(sender_id, False)
 
 @app.get("/bookings", response_model=List[Booking])
 async def list_bookings(
@@ -148,7 +289,19 @@ async def list_bookings(
 ):
     """List all bookings, optionally filtered by guest email."""
     filters = {"guest.email": guest_email} if guest_email else None
-    return await booking_service.list(filters)
+    
+    async def stream_bookings():
+        # Emit a JSON array one booking at a time instead of building it in memory
+        yield b"["
+        first = True
+        async for booking in booking_service.iter(filters):
+            if not first:
+                yield b","
+            yield booking.model_dump_json()
+            first = False
+        yield b"]"
+    
+    return StreamingResponse(stream_bookings(), media_type="application/json")
 
 @app.get("/bookings/{booking_id}", response_model=Booking)
 async def get_booking(
@@ -159,30 +312,36 @@ async def get_booking(
     booking = await booking_service.get(booking_id)
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
-    return booking
+    return ORJSONResponse(content=booking.model_dump())
 
 @app.post("/bookings", response_model=Booking)
 async def create_booking(
-    booking_data: dict,
+    booking_data: BookingCreate,
     booking_service: BookingService = Depends(get_booking_service)
 ):
     """Create a new booking."""
     try:
-        return await booking_service.create(booking_data)
+        booking = await booking_service.create(booking_data.model_dump())
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return ORJSONResponse(content=booking.model_dump())
 
 @app.put("/bookings/{booking_id}", response_model=Booking)
 async def update_booking(
     booking_id: UUID,
-    booking_data: dict,
+    booking_data: BookingUpdate,
     booking_service: BookingService = Depends(get_booking_service)
 ):
     """Update an existing booking."""
     try:
-        return await booking_service.update(booking_id, booking_data)
+        booking = await booking_service.update(
+            booking_id,
+            # An explicit null means "keep the current value", like an omitted field
+            booking_data.model_dump(exclude_unset=True, exclude_none=True)
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return ORJSONResponse(content=booking.model_dump())
 
 @app.delete("/bookings/{booking_id}")
 async def delete_booking(
@@ -195,9 +354,27 @@ async def delete_booking(
     return {"message": "Booking deleted successfully"}
 
 @app.get("/hotel/info")
-async def hotel_info():
+async def hotel_info(request: Request):
     """Get hotel information."""
-    return HOTEL_CONFIG
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        return Response(
+            content=_HOTEL_CONFIG_GZ,
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+        )
+    # Tell caches this answer differs from the gzip one
+    return Response(
+        content=HOTEL_CONFIG_JSON,
+        media_type="application/json",
+        headers={"Vary": "Accept-Encoding"}
+    )
 
 if __name__ == "__main__":
-    uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        reload=DEBUG
+    ) 
\ No newline at end of file
@@ -2,8 +2,11 @@
 Configuration module for the Hotel Booking AI Agent.
 """
 import os
+import sys
 from pathlib import Path
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
+import orjson
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from loguru import logger
@@ -28,17 +31,33 @@ class APIConfig(BaseModel):
     instagram_access_token: str = os.getenv("INSTAGRAM_ACCESS_TOKEN", "")
     instagram_app_id: str = os.getenv("INSTAGRAM_APP_ID", "")
     instagram_app_secret: str = os.getenv("INSTAGRAM_APP_SECRET", "")
+    instagram_max_concurrency: int = int(os.getenv("INSTAGRAM_MAX_CONCURRENCY", "10"))
 
 class LLMConfig(BaseModel):
     """LLM configuration."""
     model: str = os.getenv("OPENAI_MODEL", "gpt-4-turbo-preview")
     temperature: float = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
     max_tokens: int = int(os.getenv("OPENAI_MAX_TOKENS", "1000"))
+    embedding_model: str = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+    cache_size: int = int(os.getenv("LLM_CACHE_SIZE", "1024"))
 
 class AppConfig(BaseModel):
     """Application configuration."""
     debug: bool = os.getenv("DEBUG", "False").lower() == "true"
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    anyio_threads: int = int(os.getenv("ANYIO_THREADS", "200"))
+    max_inflight_messages: int = int(os.getenv("MAX_INFLIGHT_MSGS", "32"))
+    intent_cache_size: int = int(os.getenv("INTENT_CACHE_SIZE", "10000"))
+    kb_top_k: int = int(os.getenv("KB_TOP_K", "3"))
+    wal_compact_every: int = int(os.getenv("WAL_COMPACT_EVERY", "500"))
+    wal_flush_interval_ms: int = int(os.getenv("WAL_FLUSH_INTERVAL_MS", "0"))
+
+class RedisConfig(BaseModel):
+    """Redis configuration."""
+    url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    conversation_ttl: int = int(os.getenv("CONVERSATION_TTL", "3600"))
+    intent_cache_ttl: int = int(os.getenv("INTENT_CACHE_TTL", "86400"))
 
 class HotelConfig(BaseModel):
     """Hotel configuration."""
@@ -69,6 +88,12 @@ class HotelConfig(BaseModel):
         "payment": "Credit card required for reservation",
     }
 
+def _freeze(value: Any) -> Any:
+    """Recursively wrap dicts in read-only mapping proxies."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return value
+
 # Initialize configurations
 paths = Paths()
 paths.create_directories()
@@ -76,6 +101,7 @@ paths.create_directories()
 api_config = APIConfig()
 llm_config = LLMConfig()
 app_config = AppConfig()
+redis_config = RedisConfig()
 hotel_config = HotelConfig()
 
 # Configure logging
@@ -86,23 +112,41 @@ logger.add(
     rotation="500 MB",
     retention="10 days",
     format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
+    enqueue=True,
 )
-logger.add(lambda msg: print(msg), level="INFO", format="{message}")  # Console output
+# Console output; enqueue hands writes to a background thread off the request path
+logger.add(sys.stdout, level=app_config.log_level, format="{message}", enqueue=True)
 
 # Export configuration values
 OPENAI_API_KEY = api_config.openai_api_key
 OPENAI_MODEL = llm_config.model
 OPENAI_TEMPERATURE = llm_config.temperature
 OPENAI_MAX_TOKENS = llm_config.max_tokens
+OPENAI_EMBEDDING_MODEL = llm_config.embedding_model
+LLM_CACHE_SIZE = llm_config.cache_size
 
 INSTAGRAM_ACCESS_TOKEN = api_config.instagram_access_token
 INSTAGRAM_APP_ID = api_config.instagram_app_id
 INSTAGRAM_APP_SECRET = api_config.instagram_app_secret
+INSTAGRAM_MAX_CONCURRENCY = api_config.instagram_max_concurrency
 
 DEBUG = app_config.debug
 LOG_LEVEL = app_config.log_level
+ANYIO_THREADS = app_config.anyio_threads
+MAX_INFLIGHT_MESSAGES = app_config.max_inflight_messages
+INTENT_CACHE_SIZE = app_config.intent_cache_size
+KB_TOP_K = app_config.kb_top_k
+WAL_COMPACT_EVERY = app_config.wal_compact_every
+WAL_FLUSH_INTERVAL_MS = app_config.wal_flush_interval_ms
+
+REDIS_URL = redis_config.url
+REDIS_MAX_CONNECTIONS = redis_config.max_connections
+CONVERSATION_TTL = redis_config.conversation_ttl
+INTENT_CACHE_TTL = redis_config.intent_cache_ttl
 
 MOCK_DATA_FILE = paths.data_dir / "mock_hotel_data.json"
 RESERVATIONS_FILE = paths.data_dir / "reservations.json"
 
-HOTEL_CONFIG = hotel_config.dict() 
\ No newline at end of file
+_hotel_config_data = hotel_config.model_dump()
+HOTEL_CONFIG: Mapping[str, Any] = _freeze(_hotel_config_data)
+HOTEL_CONFIG_JSON: bytes = orjson.dumps(_hotel_config_data) 
\ No newline at end of file
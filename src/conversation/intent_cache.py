@@ -0,0 +1,68 @@
+"""
+Intent classification cache.
+"""
+import hashlib
+import re
+from typing import Optional
+from redis.asyncio import Redis
+
+from ..utils.cache import LRUCache
+
+# Unambiguous keywords that map straight to an intent without asking the LLM
+_KEYWORD_INTENTS = {
+    "cancel": "cancellation",
+    "reschedule": "rescheduling",
+}
+_KEYWORD_PATTERN = re.compile(r"\b(" + "|".join(_KEYWORD_INTENTS) + r")\b")
+
+class IntentCache:
+    """Caches classified intents by normalized message text.
+    
+    Lookups hit an in-process LRU first and fall back to Redis, so repeated
+    messages skip the LLM round trip across all workers.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int,
+        redis: Optional[Redis] = None,
+        ttl: int = 86400,
+        prefix: str = "intent:"
+    ):
+        """Initialize intent cache."""
+        self.local: LRUCache[str] = LRUCache(maxsize)
+        self.redis = redis
+        self.ttl = ttl
+        self.prefix = prefix
+    
+    @staticmethod
+    def normalize(message: str) -> str:
+        """Normalize a message into a cache key."""
+        return message.strip().lower()[:128]
+    
+    @staticmethod
+    def keyword_intent(message: str) -> Optional[str]:
+        """Detect intents that are obvious from a keyword alone."""
+        match = _KEYWORD_PATTERN.search(message.lower())
+        return _KEYWORD_INTENTS[match.group(1)] if match else None
+    
+    def _redis_key(self, key: str) -> str:
+        return self.prefix + hashlib.sha1(key.encode("utf-8")).hexdigest()
+    
+    async def get(self, message: str) -> Optional[str]:
+        """Get the cached intent for a message."""
+        key = self.normalize(message)
+        intent = self.local.get(key)
+        if intent is None and self.redis is not None:
+            raw = await self.redis.get(self._redis_key(key))
+            if raw is not None:
+                intent = raw.decode("utf-8")
+                self.local.set(key, intent)
+        return intent
+    
+    async def set(self, message: str, intent: str) -> None:
+        """Cache the intent for a message."""
+        key = self.normalize(message)
+        self.local.set(key, intent)
+        if self.redis is not None:
+            await self.redis.setex(self._redis_key(key), self.ttl, intent)
@@ -0,0 +1,80 @@
+"""
+Embedding-based retrieval over the hotel configuration.
+"""
+from typing import Any, List, Mapping, Optional
+import numpy as np
+from loguru import logger
+
+from ..llm.base import BaseLLMClient
+from ..utils.cache import LRUCache
+
+def build_chunks(hotel_config: Mapping[str, Any]) -> List[str]:
+    """Split the hotel configuration into small self-contained text chunks."""
+    chunks = [
+        f"Hotel name: {hotel_config['name']}. Address: {hotel_config['address']}.",
+        f"Check-in time is {hotel_config['check_in_time']} and "
+        f"check-out time is {hotel_config['check_out_time']}.",
+        "Amenities: " + ", ".join(hotel_config["amenities"]) + ".",
+        "Room types: " + ", ".join(hotel_config["room_types"].values()) + ".",
+    ]
+    chunks.extend(
+        f"{topic.capitalize()} policy: {policy}."
+        for topic, policy in hotel_config["policies"].items()
+    )
+    return chunks
+
+class KnowledgeBase:
+    """Answers retrieval queries from pre-embedded hotel information chunks.
+    
+    Chunk vectors are computed once at startup; each query costs one embedding
+    call, skipped entirely when the normalized query was seen recently.
+    """
+    
+    def __init__(
+        self,
+        llm_client: BaseLLMClient,
+        chunks: List[str],
+        top_k: int = 3,
+        cache_size: int = 1024
+    ):
+        """Initialize knowledge base."""
+        self.llm_client = llm_client
+        self.chunks = chunks
+        self.top_k = top_k
+        self.query_cache: LRUCache[np.ndarray] = LRUCache(cache_size)
+        self.vectors: Optional[np.ndarray] = None
+    
+    @staticmethod
+    def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+        return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+    
+    async def load(self) -> None:
+        """Embed all chunks once."""
+        try:
+            embeddings = await self.llm_client.embed(self.chunks)
+        except Exception as e:
+            logger.error(f"Error embedding knowledge base: {str(e)}")
+            return
+        self.vectors = self._normalize_rows(np.asarray(embeddings, dtype=np.float32))
+    
+    async def _embed_query(self, query: str) -> np.ndarray:
+        key = " ".join(query.lower().split())
+        vector = self.query_cache.get(key)
+        if vector is None:
+            [embedding] = await self.llm_client.embed([key])
+            vector = self._normalize_rows(np.asarray(embedding, dtype=np.float32))
+            self.query_cache.set(key, vector)
+        return vector
+    
+    async def search(self, query: str) -> List[str]:
+        """Return the chunks most relevant to a query, best first."""
+        if self.vectors is None:
+            # Embeddings unavailable, fall back to the full configuration
+            return self.chunks
+        try:
+            vector = await self._embed_query(query)
+        except Exception as e:
+            logger.error(f"Error embedding query: {str(e)}")
+            return self.chunks
+        scores = self.vectors @ vector
+        return [self.chunks[i] for i in np.argsort(-scores)[:self.top_k]]
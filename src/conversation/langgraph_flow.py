@@ -1,29 +1,95 @@
 """
 LangGraph implementation for hotel booking conversation flow.
 """
-from typing import Dict, Any, List, Tuple, Annotated
+from typing import Dict, Any, List, Optional, Tuple, Annotated, TypedDict
+import re
+from datetime import datetime
+import anyio
 from langgraph.graph import StateGraph, END
+from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolExecutor
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from pydantic import BaseModel, Field
+from langchain_core.messages import (
+    HumanMessage,
+    AIMessage,
+    SystemMessage,
+    messages_from_dict,
+    messages_to_dict
+)
+from pydantic import BaseModel
 
 from ..services.booking import BookingService
-from ..llm.base import BaseLLMClient
+from ..llm.base import BaseLLMClient, Message
 from ..prompts.base import SystemPrompts
 from ..config import HOTEL_CONFIG
 from ..utils.date_parser import DateParser
+from .intent_cache import IntentCache
+from .knowledge_base import KnowledgeBase
+from .state_store import BaseStateStore
 
-class ConversationState(BaseModel):
-    """State model for the conversation graph."""
-    messages: List[HumanMessage | AIMessage | SystemMessage] = Field(default_factory=list)
-    current_intent: str | None = None
-    collected_data: Dict[str, Any] = Field(default_factory=dict)
-    booking_id: str | None = None
-    error: str | None = None
+# Hotel configuration is constant, so derived strings and lookups are built once
+_ROOM_TYPES_MENU = "\n".join(f"- {name}" for name in HOTEL_CONFIG["room_types"].values())
+
+# The intent prompt is formatted on every message; splitting it once around its
+# only placeholder turns formatting into plain concatenation
+_INTENT_PREFIX, _INTENT_SUFFIX = SystemPrompts.INTENT_CLASSIFIER.template.split("{message}")
+
+# Every room key and name maps to its room type; longest phrases are tried first
+# so "presidential suite" wins over the bare "suite" keyword
+_ROOM_TYPE_KEYWORDS = {
+    **{key.lower(): key for key in HOTEL_CONFIG["room_types"]},
+    **{name.lower(): key for key, name in HOTEL_CONFIG["room_types"].items()},
+}
+_ROOM_TYPE_PATTERN = re.compile(
+    r"\b(" + "|".join(
+        re.escape(keyword)
+        for keyword in sorted(_ROOM_TYPE_KEYWORDS, key=len, reverse=True)
+    ) + ")"
+)
+
+def _match_room_type(message: str) -> Optional[str]:
+    """Find the first room type mentioned in a message in a single scan."""
+    match = _ROOM_TYPE_PATTERN.search(message.lower())
+    return _ROOM_TYPE_KEYWORDS[match.group(1)] if match else None
+
+class ConversationState(TypedDict):
+    """State for the conversation graph.
+    
+    Nodes return only the keys they change; new messages are appended to the
+    history by the add_messages reducer rather than replacing it.
+    """
+    messages: Annotated[List[HumanMessage | AIMessage | SystemMessage], add_messages]
+    current_intent: Optional[str]
+    collected_data: Dict[str, Any]
+    booking_id: Optional[str]
+    error: Optional[str]
+
+def _new_state() -> ConversationState:
+    """Return the state for a user with no conversation yet."""
+    return ConversationState(
+        messages=[],
+        current_intent=None,
+        collected_data={},
+        booking_id=None,
+        error=None
+    )
+
+_INTENT_ROUTES = {
+    "booking": "booking_flow",
+    "rescheduling": "rescheduling_flow",
+    "inquiry": "inquiry_flow",
+}
+
+def _route_intent(state: ConversationState) -> str:
+    """Pick the flow node for the detected intent."""
+    if state["error"] is not None:
+        return END
+    return _INTENT_ROUTES.get(state["current_intent"], END)
 
 def create_conversation_graph(
     llm_client: BaseLLMClient,
-    booking_service: BookingService
+    booking_service: BookingService,
+    intent_cache: IntentCache,
+    knowledge_base: KnowledgeBase
 ) -> StateGraph:
     """Create the conversation graph for hotel booking flow."""
     
@@ -33,190 +99,201 @@ def create_conversation_graph(
     # Add nodes
     
     # 1. Intent Detection Node
-    async def detect_intent(state: ConversationState) -> ConversationState:
+    async def detect_intent(state: ConversationState) -> Dict[str, Any]:
         """Detect user intent from the last message."""
-        if not state.messages:
-            return state
+        if not state["messages"]:
+            return {}
             
-        last_message = state.messages[-1].content
-        prompt = SystemPrompts.INTENT_CLASSIFIER.format(message=last_message)
+        last_message = state["messages"][-1].content
+        intent = IntentCache.keyword_intent(last_message)
+        if intent is None:
+            intent = await intent_cache.get(last_message)
         
-        response = await llm_client.generate_structured_response(
-            messages=[SystemMessage(content=prompt)],
-            response_model=BaseModel
-        )
+        if intent is None:
+            prompt = _INTENT_PREFIX + last_message + _INTENT_SUFFIX
+            
+            response = await llm_client.generate_structured_response(
+                messages=[Message(role="system", content=prompt)],
+                response_model=BaseModel
+            )
+            intent = response.model_dump()["intent"]
+            await intent_cache.set(last_message, intent)
         
-        state.current_intent = response.dict()["intent"]
-        return state
+        return {"current_intent": intent}
     
     workflow.add_node("detect_intent", detect_intent)
     
     # 2. Booking Flow Node
-    async def handle_booking(state: ConversationState) -> ConversationState:
+    async def handle_booking(state: ConversationState) -> Dict[str, Any]:
         """Handle the booking conversation flow."""
-        if not state.collected_data:
+        collected_data = state["collected_data"]
+        if not collected_data:
             # Start collecting booking information
             response = "When would you like to check in and check out?"
-            state.messages.append(AIMessage(content=response))
-            return state
+            return {"messages": [AIMessage(content=response)]}
             
-        if "dates" not in state.collected_data:
+        if "dates" not in collected_data:
             # Extract dates from last message
-            last_message = state.messages[-1].content
-            dates = DateParser.extract_dates(last_message)
+            last_message = state["messages"][-1].content
+            # Read the clock once for both parsing and validation
+            now = datetime.now()
+            # Parsing is CPU-bound, keep it off the event loop
+            dates = await anyio.to_thread.run_sync(DateParser.extract_dates, last_message, now)
             
             if dates:
                 # Validate date range
                 is_valid, error_msg = DateParser.is_valid_date_range(
                     dates["check_in"],
-                    dates["check_out"]
+                    dates["check_out"],
+                    now
                 )
                 
                 if is_valid:
-                    state.collected_data["dates"] = dates
                     # Ask for room type
-                    room_types = "\n".join(f"- {name}" for name in HOTEL_CONFIG["room_types"].values())
-                    response = f"What type of room would you prefer? Available options:\n{room_types}"
-                else:
-                    response = f"I couldn't use those dates: {error_msg}. Please provide different dates."
+                    response = f"What type of room would you prefer? Available options:\n{_ROOM_TYPES_MENU}"
+                    return {
+                        "collected_data": {**collected_data, "dates": dates},
+                        "messages": [AIMessage(content=response)]
+                    }
+                response = f"I couldn't use those dates: {error_msg}. Please provide different dates."
             else:
                 response = "I couldn't understand the dates. Please provide check-in and check-out dates in a format like 'DD/MM/YYYY' or 'Month DD, YYYY'."
             
-            state.messages.append(AIMessage(content=response))
-            return state
+            return {"messages": [AIMessage(content=response)]}
             
-        if "room_type" not in state.collected_data:
+        if "room_type" not in collected_data:
             # Extract room type from last message
-            last_message = state.messages[-1].content.lower()
-            room_type = None
-            
-            for key, name in HOTEL_CONFIG["room_types"].items():
-                if key in last_message or name.lower() in last_message:
-                    room_type = key
-                    break
+            room_type = _match_room_type(state["messages"][-1].content)
             
             if room_type:
-                state.collected_data["room_type"] = room_type
                 response = "Please provide your name and email for the booking."
-            else:
-                room_types = "\n".join(f"- {name}" for name in HOTEL_CONFIG["room_types"].values())
-                response = f"I didn't catch that. Please choose from these room types:\n{room_types}"
+                return {
+                    "collected_data": {**collected_data, "room_type": room_type},
+                    "messages": [AIMessage(content=response)]
+                }
             
-            state.messages.append(AIMessage(content=response))
-            return state
+            response = f"I didn't catch that. Please choose from these room types:\n{_ROOM_TYPES_MENU}"
+            return {"messages": [AIMessage(content=response)]}
             
-        if "guest" not in state.collected_data:
+        if "guest" not in collected_data:
             # Extract guest information from last message
-            last_message = state.messages[-1].content
+            last_message = state["messages"][-1].content
             
             # TODO: Implement better guest info extraction
             # For now, just store the message as guest info
-            state.collected_data["guest"] = {"info": last_message}
+            collected_data = {**collected_data, "guest": {"info": last_message}}
             
             try:
                 # Create booking
-                booking = await booking_service.create(state.collected_data)
-                state.booking_id = str(booking.id)
+                booking = await booking_service.create(collected_data)
                 confirmation = await booking_service.generate_confirmation_message(booking)
-                state.messages.append(AIMessage(content=confirmation))
             except ValueError as e:
-                state.error = str(e)
-                state.messages.append(AIMessage(content=f"Error creating booking: {str(e)}"))
+                return {
+                    "collected_data": collected_data,
+                    "error": str(e),
+                    "messages": [AIMessage(content=f"Error creating booking: {str(e)}")]
+                }
             
-            return state
+            return {
+                "collected_data": collected_data,
+                "booking_id": str(booking.id),
+                "messages": [AIMessage(content=confirmation)]
+            }
             
-        return state
+        return {}
         
     workflow.add_node("booking_flow", handle_booking)
     
     # 3. Rescheduling Flow Node
-    async def handle_rescheduling(state: ConversationState) -> ConversationState:
+    async def handle_rescheduling(state: ConversationState) -> Dict[str, Any]:
         """Handle the rescheduling conversation flow."""
-        if not state.booking_id:
+        booking_id = state["booking_id"]
+        if not booking_id:
             response = "Please provide your booking ID to reschedule."
-            state.messages.append(AIMessage(content=response))
-            return state
+            return {"messages": [AIMessage(content=response)]}
             
-        booking = await booking_service.get(state.booking_id)
+        booking = await booking_service.get(booking_id)
         if not booking:
-            response = f"Booking {state.booking_id} not found."
-            state.messages.append(AIMessage(content=response))
-            state.error = "Booking not found"
-            return state
+            response = f"Booking {booking_id} not found."
+            return {"error": "Booking not found", "messages": [AIMessage(content=response)]}
             
-        if "new_dates" not in state.collected_data:
+        collected_data = state["collected_data"]
+        if "new_dates" not in collected_data:
             # Try to extract dates from last message
-            last_message = state.messages[-1].content
-            dates = DateParser.extract_dates(last_message)
+            last_message = state["messages"][-1].content
+            # Read the clock once for both parsing and validation
+            now = datetime.now()
+            # Parsing is CPU-bound, keep it off the event loop
+            dates = await anyio.to_thread.run_sync(DateParser.extract_dates, last_message, now)
             
             if dates:
                 # Validate date range
                 is_valid, error_msg = DateParser.is_valid_date_range(
                     dates["check_in"],
-                    dates["check_out"]
+                    dates["check_out"],
+                    now
                 )
                 
                 if is_valid:
-                    state.collected_data["new_dates"] = dates
+                    collected_data = {**collected_data, "new_dates": dates}
                     try:
                         updated_booking = await booking_service.update(
-                            state.booking_id,
+                            booking_id,
                             {
                                 "check_in_date": dates["check_in"],
                                 "check_out_date": dates["check_out"]
                             }
                         )
                         confirmation = await booking_service.generate_confirmation_message(updated_booking)
-                        state.messages.append(AIMessage(content=confirmation))
                     except ValueError as e:
-                        state.error = str(e)
-                        state.messages.append(AIMessage(content=f"Error rescheduling booking: {str(e)}"))
-                else:
-                    response = f"I couldn't use those dates: {error_msg}. Please provide different dates."
-                    state.messages.append(AIMessage(content=response))
+                        return {
+                            "collected_data": collected_data,
+                            "error": str(e),
+                            "messages": [AIMessage(content=f"Error rescheduling booking: {str(e)}")]
+                        }
+                    return {
+                        "collected_data": collected_data,
+                        "messages": [AIMessage(content=confirmation)]
+                    }
+                response = f"I couldn't use those dates: {error_msg}. Please provide different dates."
             else:
                 response = "What dates would you like to reschedule to? Please provide dates in a format like 'DD/MM/YYYY' or 'Month DD, YYYY'."
-                state.messages.append(AIMessage(content=response))
             
-            return state
+            return {"messages": [AIMessage(content=response)]}
             
-        return state
+        return {}
         
     workflow.add_node("rescheduling_flow", handle_rescheduling)
     
     # 4. Inquiry Flow Node
-    async def handle_inquiry(state: ConversationState) -> ConversationState:
+    async def handle_inquiry(state: ConversationState) -> Dict[str, Any]:
         """Handle general inquiries about the hotel."""
-        last_message = state.messages[-1].content
+        last_message = state["messages"][-1].content
+        # Only the most relevant facts go into the prompt, not the whole config
+        hotel_info = "\n".join(await knowledge_base.search(last_message))
         prompt = f"""Based on the following hotel information, please answer the user's question:
 
 Hotel Information:
-{HOTEL_CONFIG}
+{hotel_info}
 
 User's question: {last_message}"""
         
         response = await llm_client.generate_response(
-            messages=[SystemMessage(content=prompt)]
+            messages=[Message(role="system", content=prompt)]
         )
-        state.messages.append(AIMessage(content=response.content))
-        return state
+        return {"messages": [AIMessage(content=response.content)]}
         
     workflow.add_node("inquiry_flow", handle_inquiry)
     
     # Add edges
     
     # From intent detection to specific flows
-    workflow.add_edge("detect_intent", lambda x: {
-        "booking_flow": x.current_intent == "booking",
-        "rescheduling_flow": x.current_intent == "rescheduling",
-        "inquiry_flow": x.current_intent == "inquiry",
-        END: x.error is not None
-    })
-    
-    # From flows back to intent detection for next message
-    workflow.add_edge("booking_flow", lambda x: "detect_intent" if not x.error else END)
-    workflow.add_edge("rescheduling_flow", lambda x: "detect_intent" if not x.error else END)
-    workflow.add_edge("inquiry_flow", lambda x: "detect_intent" if not x.error else END)
+    workflow.add_conditional_edges("detect_intent", _route_intent)
+    
+    # Each flow answers one message; the next message starts a new run
+    workflow.add_edge("booking_flow", END)
+    workflow.add_edge("rescheduling_flow", END)
+    workflow.add_edge("inquiry_flow", END)
     
     # Set entry point
     workflow.set_entry_point("detect_intent")
@@ -229,27 +306,50 @@ class LangGraphManager:
     def __init__(
         self,
         llm_client: BaseLLMClient,
-        booking_service: BookingService
+        booking_service: BookingService,
+        state_store: BaseStateStore,
+        intent_cache: IntentCache,
+        knowledge_base: KnowledgeBase
     ):
         """Initialize LangGraph manager."""
-        self.graph = create_conversation_graph(llm_client, booking_service)
-        self.states: Dict[str, ConversationState] = {}
+        # The graph shape is fixed, so compile it once and reuse the runnable
+        self.runnable = create_conversation_graph(
+            llm_client,
+            booking_service,
+            intent_cache,
+            knowledge_base
+        ).compile()
+        self.state_store = state_store
     
-    def get_state(self, user_id: str) -> ConversationState:
+    async def get_state(self, user_id: str) -> ConversationState:
         """Get or create conversation state for a user."""
-        if user_id not in self.states:
-            self.states[user_id] = ConversationState()
-        return self.states[user_id]
+        data = await self.state_store.get(user_id)
+        if data is None:
+            return _new_state()
+        
+        state = _new_state()
+        state.update(data)
+        # Messages are langchain models, so they are restored separately
+        state["messages"] = messages_from_dict(data.get("messages", []))
+        return state
+    
+    async def save_state(self, user_id: str, state: ConversationState) -> None:
+        """Persist conversation state for a user."""
+        data = {key: value for key, value in state.items() if key != "messages"}
+        data["messages"] = messages_to_dict(state["messages"])
+        await self.state_store.set(user_id, data)
     
     async def handle_message(self, user_id: str, message: str) -> str:
         """Handle incoming user message using LangGraph flow."""
-        state = self.get_state(user_id)
-        state.messages.append(HumanMessage(content=message))
+        state = await self.get_state(user_id)
+        state["messages"].append(HumanMessage(content=message))
         
         # Run the graph
-        final_state = await self.graph.arun(state)
+        final_state = await self.runnable.ainvoke(state)
+        await self.save_state(user_id, final_state)
         
         # Get the last AI message as response
-        if final_state.messages and isinstance(final_state.messages[-1], AIMessage):
-            return final_state.messages[-1].content
-        return "I apologize, but I couldn't process your request. Please try again." 
\ No newline at end of file
+        messages = final_state["messages"]
+        if messages and isinstance(messages[-1], AIMessage):
+            return messages[-1].content
+        return "I apologize, but I couldn't process your request. Please try again."
@@ -6,7 +6,10 @@ from uuid import UUID
 
 from ..llm.base import BaseLLMClient
 from ..services.booking import BookingService
+from .intent_cache import IntentCache
+from .knowledge_base import KnowledgeBase
 from .langgraph_flow import LangGraphManager
+from .state_store import BaseStateStore
 
 class ConversationManager:
     """Manages conversation flow and state using LangGraph."""
@@ -14,10 +17,19 @@ class ConversationManager:
     def __init__(
         self,
         llm_client: BaseLLMClient,
-        booking_service: BookingService
+        booking_service: BookingService,
+        state_store: BaseStateStore,
+        intent_cache: IntentCache,
+        knowledge_base: KnowledgeBase
     ):
         """Initialize conversation manager."""
-        self.langgraph_manager = LangGraphManager(llm_client, booking_service)
+        self.langgraph_manager = LangGraphManager(
+            llm_client,
+            booking_service,
+            state_store,
+            intent_cache,
+            knowledge_base
+        )
     
     async def handle_message(self, user_id: str, message: str) -> str:
         """Handle incoming user message."""
@@ -0,0 +1,55 @@
+"""
+Conversation state store implementations.
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional
+import orjson
+from redis.asyncio import Redis
+
+class BaseStateStore(ABC):
+    """Abstract base class for per-user conversation state stores."""
+    
+    @abstractmethod
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get the stored state for a user."""
+        pass
+    
+    @abstractmethod
+    async def set(self, user_id: str, state: Dict[str, Any]) -> None:
+        """Store the state for a user."""
+        pass
+
+class RedisStateStore(BaseStateStore):
+    """Redis-backed state store shared across worker processes."""
+    
+    def __init__(self, redis: Redis, ttl: int, prefix: str = "conv:"):
+        """Initialize Redis state store."""
+        self.redis = redis
+        self.ttl = ttl
+        self.prefix = prefix
+    
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get the stored state for a user."""
+        raw = await self.redis.get(f"{self.prefix}{user_id}")
+        if raw is None:
+            return None
+        return orjson.loads(raw)
+    
+    async def set(self, user_id: str, state: Dict[str, Any]) -> None:
+        """Store the state for a user, refreshing its expiry."""
+        await self.redis.setex(f"{self.prefix}{user_id}", self.ttl, orjson.dumps(state))
+
+class InMemoryStateStore(BaseStateStore):
+    """Process-local state store for development and tests."""
+    
+    def __init__(self):
+        """Initialize in-memory state store."""
+        self.states: Dict[str, Dict[str, Any]] = {}
+    
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get the stored state for a user."""
+        return self.states.get(user_id)
+    
+    async def set(self, user_id: str, state: Dict[str, Any]) -> None:
+        """Store the state for a user."""
+        self.states[user_id] = state
@@ -1,49 +1,155 @@
 """
 Data storage module for managing hotel reservations.
 """
-import json
-import uuid
-from datetime import datetime
-from typing import Dict, List, Optional
+import os
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+import orjson
 from loguru import logger
 from config import RESERVATIONS_FILE, MOCK_DATA_FILE
+from utils.ids import uuid7
 
 class ReservationStorage:
-    """Handles storage and retrieval of hotel reservations."""
+    """Handles storage and retrieval of hotel reservations.
     
-    def __init__(self):
+    Reservations live in memory, indexed by booking ID and room type. Writes are
+    appended to a JSON-lines log next to the snapshot file, and the log is folded
+    into a fresh snapshot once it grows past ``compact_threshold`` bytes. Files
+    are only re-read when they change on disk.
+    """
+    
+    def __init__(self, reservations_file: Optional[Path] = None, compact_threshold: int = 1 << 20):
         """Initialize the storage system."""
-        self.reservations_file = RESERVATIONS_FILE
+        self.reservations_file = Path(reservations_file or RESERVATIONS_FILE)
+        self.log_file = self.reservations_file.with_suffix(".jsonl")
+        self.compact_threshold = compact_threshold
+        self._data: Dict = {}
+        self._file_state: Optional[Tuple[int, int, int]] = None
+        self._by_id: Dict[str, Dict] = {}
+        # room_type -> (check_in, check_out, booking_id) stays sorted by check-in
+        self._by_room: Dict[str, List[Tuple[datetime, datetime, str]]] = defaultdict(list)
+        # Longest stay seen per room type; bounds how far back an overlap can start
+        self._max_stay: Dict[str, timedelta] = defaultdict(timedelta)
+        self._stays: Dict[str, Tuple[str, Tuple[datetime, datetime, str]]] = {}
         self._ensure_storage_exists()
+        self._load_data()
     
     def _ensure_storage_exists(self):
         """Ensure the storage file exists with proper structure."""
         if not self.reservations_file.exists():
-            self.reservations_file.parent.mkdir(exist_ok=True)
+            self.reservations_file.parent.mkdir(parents=True, exist_ok=True)
             self._save_data({"reservations": [], "last_updated": datetime.now().isoformat()})
     
+    def _stat(self) -> Tuple[int, int, int]:
+        """Fingerprint the snapshot and log so external writes can be detected."""
+        snapshot_mtime = self.reservations_file.stat().st_mtime_ns
+        try:
+            log_stat = self.log_file.stat()
+        except FileNotFoundError:
+            return (snapshot_mtime, 0, 0)
+        return (snapshot_mtime, log_stat.st_mtime_ns, log_stat.st_size)
+    
     def _load_data(self) -> Dict:
-        """Load data from storage file."""
+        """Load the snapshot and replay the log, reusing the cache if unchanged."""
+        file_state = self._stat()
+        if file_state == self._file_state:
+            return self._data
+        
         try:
-            with open(self.reservations_file, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
+            with open(self.reservations_file, 'rb') as f:
+                data = orjson.loads(f.read())
+        except orjson.JSONDecodeError:
             logger.error(f"Error decoding {self.reservations_file}")
-            return {"reservations": [], "last_updated": datetime.now().isoformat()}
+            data = {"reservations": [], "last_updated": datetime.now().isoformat()}
+        
+        self._by_id = {r["booking_id"]: r for r in data["reservations"]}
+        if self.log_file.exists():
+            with open(self.log_file, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        # A torn final line from an interrupted append
+                        logger.warning(f"Skipping unreadable line in {self.log_file}")
+                        continue
+                    record = entry["rec"]
+                    if entry["op"] == "delete":
+                        self._by_id.pop(record["booking_id"], None)
+                    else:
+                        self._by_id[record["booking_id"]] = record
+        
+        self._by_room = defaultdict(list)
+        self._max_stay = defaultdict(timedelta)
+        self._stays = {}
+        for reservation in self._by_id.values():
+            self._index_room(reservation)
+        self._data = data
+        self._file_state = file_state
+        return data
+    
+    def _index_room(self, reservation: Dict):
+        """Index a reservation's parsed stay dates under its room type."""
+        try:
+            check_in = datetime.fromisoformat(reservation["check_in_date"])
+            check_out = datetime.fromisoformat(reservation["check_out_date"])
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"Reservation {reservation.get('booking_id')} has no valid stay dates")
+            return
+        room_type = reservation.get("room_type")
+        stay = (check_in, check_out, reservation["booking_id"])
+        insort(self._by_room[room_type], stay)
+        self._max_stay[room_type] = max(self._max_stay[room_type], check_out - check_in)
+        self._stays[reservation["booking_id"]] = (room_type, stay)
+    
+    def _unindex_room(self, reservation: Dict):
+        """Remove a reservation from the room type index."""
+        indexed = self._stays.pop(reservation["booking_id"], None)
+        if indexed is None:
+            return
+        room_type, stay = indexed
+        stays = self._by_room[room_type]
+        del stays[bisect_left(stays, stay)]
     
     def _save_data(self, data: Dict):
-        """Save data to storage file."""
-        with open(self.reservations_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        """Atomically write a snapshot to the storage file."""
+        tmp_file = self.reservations_file.with_suffix(".tmp")
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            # The rename is only atomic if the new contents reached disk first
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.reservations_file)
+        # Our own write must not look like an external change
+        self._data = data
+        self._file_state = self._stat()
+    
+    def _append_record(self, op: str, record: Dict):
+        """Append a single write to the log, compacting when it gets large."""
+        with open(self.log_file, 'ab') as f:
+            f.write(orjson.dumps({"op": op, "rec": record}) + b"\n")
+        self._file_state = self._stat()
+        if self._file_state[2] > self.compact_threshold:
+            self._compact()
+    
+    def _compact(self):
+        """Fold the log into a fresh snapshot and start a new log."""
+        self._save_data({
+            "reservations": list(self._by_id.values()),
+            "last_updated": datetime.now().isoformat()
+        })
+        self.log_file.unlink(missing_ok=True)
+        self._file_state = self._stat()
     
     def create_reservation(self, booking_details: Dict) -> str:
         """Create a new reservation."""
-        data = self._load_data()
+        self._load_data()
         
-        # Generate unique booking ID
-        booking_id = str(uuid.uuid4())
+        # Generate a unique, time-ordered booking ID
+        booking_id = str(uuid7())
         
         # Add metadata
         booking_details.update({
@@ -53,69 +159,72 @@ class ReservationStorage:
         })
         
         # Add to storage
-        data["reservations"].append(booking_details)
-        data["last_updated"] = datetime.now().isoformat()
+        self._by_id[booking_id] = booking_details
+        self._index_room(booking_details)
         
-        self._save_data(data)
+        self._append_record("create", booking_details)
         logger.info(f"Created reservation: {booking_id}")
         
         return booking_id
     
     def get_reservation(self, booking_id: str) -> Optional[Dict]:
         """Retrieve a reservation by ID."""
-        data = self._load_data()
-        
-        for reservation in data["reservations"]:
-            if reservation["booking_id"] == booking_id:
-                return reservation
-        
-        return None
+        self._load_data()
+        # Hand out a copy so callers can't change the room index behind our back
+        reservation = self._by_id.get(booking_id)
+        return dict(reservation) if reservation is not None else None
     
     def update_reservation(self, booking_id: str, updates: Dict) -> bool:
         """Update an existing reservation."""
-        data = self._load_data()
+        self._load_data()
         
-        for reservation in data["reservations"]:
-            if reservation["booking_id"] == booking_id:
-                reservation.update(updates)
-                reservation["updated_at"] = datetime.now().isoformat()
-                data["last_updated"] = datetime.now().isoformat()
-                
-                self._save_data(data)
-                logger.info(f"Updated reservation: {booking_id}")
-                return True
+        reservation = self._by_id.get(booking_id)
+        if reservation is None:
+            return False
         
-        return False
+        self._unindex_room(reservation)
+        reservation.update(updates)
+        reservation["updated_at"] = datetime.now().isoformat()
+        self._index_room(reservation)
+        
+        self._append_record("update", reservation)
+        logger.info(f"Updated reservation: {booking_id}")
+        return True
     
     def delete_reservation(self, booking_id: str) -> bool:
         """Delete a reservation."""
-        data = self._load_data()
+        self._load_data()
         
-        initial_length = len(data["reservations"])
-        data["reservations"] = [r for r in data["reservations"] if r["booking_id"] != booking_id]
+        reservation = self._by_id.pop(booking_id, None)
+        if reservation is None:
+            return False
         
-        if len(data["reservations"]) < initial_length:
-            data["last_updated"] = datetime.now().isoformat()
-            self._save_data(data)
-            logger.info(f"Deleted reservation: {booking_id}")
-            return True
-        
-        return False
+        self._unindex_room(reservation)
+        self._append_record("delete", {"booking_id": booking_id})
+        logger.info(f"Deleted reservation: {booking_id}")
+        return True
     
     def check_availability(self, check_in: datetime, check_out: datetime, room_type: str) -> bool:
         """Check if a room is available for the given dates."""
-        data = self._load_data()
+        self._load_data()
+        
+        stays = self._by_room.get(room_type)
+        if not stays:
+            return True
         
-        # Simple availability check (can be made more sophisticated)
-        for reservation in data["reservations"]:
-            if (reservation["room_type"] == room_type and
-                datetime.fromisoformat(reservation["check_in_date"]) < check_out and
-                datetime.fromisoformat(reservation["check_out_date"]) > check_in):
+        # Only stays starting before check_out can overlap; walk back from there
+        # until no stay could still be running at check_in
+        earliest_start = check_in - self._max_stay[room_type]
+        for i in range(bisect_left(stays, (check_out,)) - 1, -1, -1):
+            booked_in, booked_out, _ = stays[i]
+            if booked_in < earliest_start:
+                break
+            if booked_out > check_in:
                 return False
         
         return True
     
     def get_all_reservations(self) -> List[Dict]:
         """Get all reservations."""
-        data = self._load_data()
-        return data["reservations"] 
\ No newline at end of file
+        self._load_data()
+        return [dict(reservation) for reservation in self._by_id.values()]
\ No newline at end of file
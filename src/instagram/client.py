@@ -1,11 +1,10 @@
 """
 Instagram client implementation.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import hmac
-import hashlib
-import json
 import httpx
+import orjson
 from loguru import logger
 
 from ..config import (
@@ -18,14 +17,26 @@ from ..config import (
 class InstagramClient:
     """Instagram client for handling DM interactions."""
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         """Initialize Instagram client."""
         self.access_token = INSTAGRAM_ACCESS_TOKEN
         self.app_secret = INSTAGRAM_APP_SECRET
+        self._app_secret_key = self.app_secret.encode('utf-8')
         self.verify_token = INSTAGRAM_VERIFY_TOKEN
         self.api_version = INSTAGRAM_API_VERSION
         self.base_url = f"https://graph.facebook.com/v{self.api_version}"
-        self.client = httpx.AsyncClient()
+        # Standalone clients get their own pooled HTTP/2 connection to the Graph API
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20),
+            timeout=10.0
+        )
+    
+    async def aclose(self):
+        """Close the HTTP client if this instance created it."""
+        if self._owns_client:
+            await self.client.aclose()
     
     def verify_webhook(self, mode: str, token: str, challenge: str) -> bool:
         """Verify webhook subscription."""
@@ -33,35 +44,47 @@ class InstagramClient:
             return True
         return False
     
-    def verify_signature(self, payload: bytes, signature: str) -> bool:
+    def verify_signature(self, payload: bytes, signature: Optional[str]) -> bool:
         """Verify webhook payload signature."""
-        expected_sig = hmac.new(
-            self.app_secret.encode('utf-8'),
-            payload,
-            hashlib.sha1
-        ).hexdigest()
-        return hmac.compare_digest(f"sha1={expected_sig}", signature)
+        if not signature or not signature.startswith("sha1="):
+            return False
+        try:
+            received_sig = bytes.fromhex(signature[5:])
+        except ValueError:
+            return False
+        # One-shot digest avoids building an HMAC object per request
+        expected_sig = hmac.digest(self._app_secret_key, payload, "sha1")
+        return hmac.compare_digest(expected_sig, received_sig)
     
-    async def process_webhook(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Process webhook payload."""
+    async def process_webhook(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Process webhook payload, returning every message event it contains."""
+        messages = []
         try:
-            # Extract messaging events
-            entry = data.get("entry", [{}])[0]
-            messaging = entry.get("messaging", [{}])[0]
-            
-            # Check if it's a message event
-            if "message" not in messaging:
-                return None
-            
-            return {
-                "sender_id": messaging["sender"]["id"],
-                "recipient_id": messaging["recipient"]["id"],
-                "message": messaging["message"].get("text", ""),
-                "timestamp": messaging.get("timestamp")
-            }
+            # Meta may batch several entries and messaging events into one request
+            for entry in data.get("entry", []):
+                for messaging in entry.get("messaging", []):
+                    # Skip non-message events such as reads and deliveries
+                    if "message" not in messaging:
+                        continue
+                    
+                    messages.append({
+                        "sender_id": messaging["sender"]["id"],
+                        "recipient_id": messaging["recipient"]["id"],
+                        "message": messaging["message"].get("text", ""),
+                        "timestamp": messaging.get("timestamp")
+                    })
         except Exception as e:
             logger.error(f"Error processing webhook data: {str(e)}")
-            return None
+        return messages
+    
+    async def _post(self, url: str, payload: Dict[str, Any], params: Dict[str, str]) -> httpx.Response:
+        """POST a JSON payload encoded with orjson."""
+        return await self.client.post(
+            url,
+            content=orjson.dumps(payload),
+            params=params,
+            headers={"Content-Type": "application/json"}
+        )
     
     async def send_message(self, recipient_id: str, message: str) -> bool:
         """Send a message to a user."""
@@ -74,10 +97,9 @@ class InstagramClient:
             }
             params = {"access_token": self.access_token}
             
-            async with self.client as client:
-                response = await client.post(url, json=payload, params=params)
-                response.raise_for_status()
-                return True
+            response = await self._post(url, payload, params)
+            response.raise_for_status()
+            return True
         except Exception as e:
             logger.error(f"Error sending message: {str(e)}")
             return False
@@ -91,10 +113,9 @@ class InstagramClient:
                 "fields": "name,profile_pic"
             }
             
-            async with self.client as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
+            response = await self.client.get(url, params=params)
+            response.raise_for_status()
+            return orjson.loads(response.content)
         except Exception as e:
             logger.error(f"Error fetching user profile: {str(e)}")
             return None
@@ -109,10 +130,9 @@ class InstagramClient:
             }
             params = {"access_token": self.access_token}
             
-            async with self.client as client:
-                response = await client.post(url, json=payload, params=params)
-                response.raise_for_status()
-                return True
+            response = await self._post(url, payload, params)
+            response.raise_for_status()
+            return True
         except Exception as e:
             logger.error(f"Error marking message as seen: {str(e)}")
             return False
@@ -127,10 +147,9 @@ class InstagramClient:
             }
             params = {"access_token": self.access_token}
             
-            async with self.client as client:
-                response = await client.post(url, json=payload, params=params)
-                response.raise_for_status()
-                return True
+            response = await self._post(url, payload, params)
+            response.raise_for_status()
+            return True
         except Exception as e:
             logger.error(f"Error sending typing indicator: {str(e)}")
             return False 
\ No newline at end of file
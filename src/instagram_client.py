@@ -1,50 +1,125 @@
 """
 Instagram integration module for the Hotel Booking AI Agent.
 """
-from typing import Dict, List, Optional
-import json
-import requests
+from dataclasses import dataclass
+from functools import cache
+from typing import Annotated, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+import asyncio
+import hmac
+import os
+import httpx
+import orjson
 from datetime import datetime
 from loguru import logger
-from config import (
-    INSTAGRAM_ACCESS_TOKEN,
-    INSTAGRAM_APP_ID,
-    INSTAGRAM_APP_SECRET,
-)
+from pydantic import Field, TypeAdapter, ValidationError
+# pydantic needs the typing_extensions TypedDict before Python 3.12
+from typing_extensions import TypedDict
+# Importing config also loads .env into the environment
+from config import INSTAGRAM_MAX_CONCURRENCY
+
+_SUPPORTED_METHODS = frozenset({"GET", "POST"})
+
+# Most requests the Graph API accepts in a single batch call
+_BATCH_LIMIT = 50
+
+_NonEmptyStr = Annotated[str, Field(min_length=1)]
+
+class _WebhookSender(TypedDict):
+    id: _NonEmptyStr
+
+class _WebhookText(TypedDict):
+    text: _NonEmptyStr
+
+class _WebhookMessaging(TypedDict):
+    sender: _WebhookSender
+    message: _WebhookText
+
+# Built once at import; checks the whole messaging event in one compiled call
+_MESSAGING_ADAPTER = TypeAdapter(_WebhookMessaging)
+
+# Webhook payload limits, comfortably above what real messaging events
+# (including attachment payloads) ever reach
+_MAX_BODY_BYTES = 256 * 1024
+_MAX_DEPTH = 16
+_MAX_STR_LEN = 8192
+_MAX_ARRAY_LEN = 256
+
+def _within_limits(data) -> bool:
+    """Check a decoded payload's nesting depth, string and array sizes."""
+    stack = [(data, 1)]
+    while stack:
+        value, depth = stack.pop()
+        if isinstance(value, str):
+            if len(value) > _MAX_STR_LEN:
+                return False
+        elif isinstance(value, (dict, list)):
+            if depth > _MAX_DEPTH or len(value) > _MAX_ARRAY_LEN:
+                return False
+            children = value.values() if isinstance(value, dict) else value
+            stack.extend((child, depth + 1) for child in children)
+    return True
+
+@dataclass(slots=True, frozen=True)
+class _Credentials:
+    """Instagram app credentials."""
+    access_token: str
+    app_id: str
+    app_secret: str
+
+@cache
+def _load_credentials() -> _Credentials:
+    """Read the credentials from the environment once per process."""
+    return _Credentials(
+        access_token=os.getenv("INSTAGRAM_ACCESS_TOKEN", ""),
+        app_id=os.getenv("INSTAGRAM_APP_ID", ""),
+        app_secret=os.getenv("INSTAGRAM_APP_SECRET", "")
+    )
 
 class InstagramClient:
     """Handles Instagram API integration."""
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         """Initialize the Instagram client."""
-        self.access_token = INSTAGRAM_ACCESS_TOKEN
-        self.app_id = INSTAGRAM_APP_ID
-        self.app_secret = INSTAGRAM_APP_SECRET
+        credentials = _load_credentials()
+        self.access_token = credentials.access_token
+        self.app_id = credentials.app_id
+        self.app_secret = credentials.app_secret
         self.base_url = "https://graph.instagram.com/v12.0"
+        self.max_concurrency = INSTAGRAM_MAX_CONCURRENCY
+        self.headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json"
+        }
+        # One pooled HTTP/2 client for every call, so connections are reused
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20),
+            timeout=10.0
+        )
         
         if not all([self.access_token, self.app_id, self.app_secret]):
             logger.warning("Instagram credentials not fully configured")
     
-    def _make_request(self, endpoint: str, method: str = "GET", data: Optional[Dict] = None) -> Dict:
+    async def aclose(self):
+        """Close the HTTP client if this instance created it."""
+        if self._owns_client:
+            await self.client.aclose()
+    
+    async def _make_request(self, endpoint: str, method: str = "GET", data: Optional[Dict] = None) -> Dict:
         """Make an API request to Instagram."""
         url = f"{self.base_url}/{endpoint}"
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json"
-        }
+        
+        if method not in _SUPPORTED_METHODS:
+            raise ValueError(f"Unsupported HTTP method: {method}")
         
         try:
-            if method == "GET":
-                response = requests.get(url, headers=headers)
-            elif method == "POST":
-                response = requests.post(url, headers=headers, json=data)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
+            response = await self.client.request(method, url, headers=self.headers, json=data)
             response.raise_for_status()
             return response.json()
         
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Instagram API error: {str(e)}")
             raise
     
@@ -57,7 +132,7 @@ class InstagramClient:
                 "message": {"text": message}
             }
             
-            response = self._make_request(endpoint, method="POST", data=data)
+            response = await self._make_request(endpoint, method="POST", data=data)
             logger.info(f"Message sent to user {user_id}")
             return True
             
@@ -65,11 +140,59 @@ class InstagramClient:
             logger.error(f"Error sending message to {user_id}: {str(e)}")
             return False
     
+    async def send_many(self, items: List[Tuple[str, str]]) -> List[bool]:
+        """Send (user_id, message) pairs concurrently, at most max_concurrency at a time."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def send_one(user_id: str, message: str) -> bool:
+            async with semaphore:
+                return await self.send_message(user_id, message)
+        
+        return await asyncio.gather(*(send_one(user_id, message) for user_id, message in items))
+    
+    async def send_batch(self, items: List[Tuple[str, str]]) -> List[bool]:
+        """Send (user_id, message) pairs using one Graph API batch call per 50 messages."""
+        results = []
+        for start in range(0, len(items), _BATCH_LIMIT):
+            chunk = items[start:start + _BATCH_LIMIT]
+            batch = [
+                {
+                    "method": "POST",
+                    "relative_url": "me/messages",
+                    "body": urlencode({
+                        "recipient": orjson.dumps({"id": user_id}).decode(),
+                        "message": orjson.dumps({"text": message}).decode()
+                    })
+                }
+                for user_id, message in chunk
+            ]
+            
+            try:
+                responses = await self._make_request("", method="POST", data={"batch": batch})
+            except Exception as e:
+                logger.error(f"Error sending batch of {len(chunk)} messages: {str(e)}")
+                results.extend([False] * len(chunk))
+                continue
+            
+            if not isinstance(responses, list) or len(responses) != len(chunk):
+                # An error object for the whole call, not one entry per message
+                logger.error(f"Unexpected response to batch of {len(chunk)} messages: {responses}")
+                results.extend([False] * len(chunk))
+                continue
+            
+            # Each sub-request succeeds or fails on its own; a null entry
+            # means it timed out inside the batch
+            results.extend(
+                isinstance(response, dict) and response.get("code") == 200
+                for response in responses
+            )
+        return results
+    
     async def get_messages(self, user_id: str) -> List[Dict]:
         """Get messages from a specific user."""
         try:
             endpoint = f"me/conversations/{user_id}/messages"
-            response = self._make_request(endpoint)
+            response = await self._make_request(endpoint)
             
             messages = response.get("data", [])
             logger.info(f"Retrieved {len(messages)} messages from user {user_id}")
@@ -79,31 +202,43 @@ class InstagramClient:
             logger.error(f"Error getting messages from {user_id}: {str(e)}")
             return []
     
-    def verify_webhook(self, mode: str, token: str, challenge: str) -> Optional[str]:
+    def verify_webhook(self, mode: str, token: Optional[str], challenge: str) -> Optional[str]:
         """Verify Instagram webhook."""
-        if mode == "subscribe" and token == self.app_secret:
+        if mode != "subscribe" or not token or not self.app_secret:
+            return None
+        # Constant-time comparison so response timing doesn't leak the secret
+        if hmac.compare_digest(token.encode(), self.app_secret.encode()):
             return challenge
         return None
     
+    def process_webhook_bytes(self, body: bytes) -> Optional[Dict]:
+        """Process a raw webhook request body."""
+        if len(body) > _MAX_BODY_BYTES:
+            logger.warning(f"Rejecting oversized webhook body ({len(body)} bytes)")
+            return None
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Error decoding webhook body: {str(e)}")
+            return None
+        return self.process_webhook(data)
+    
     def process_webhook(self, data: Dict) -> Optional[Dict]:
         """Process incoming webhook data."""
+        if not _within_limits(data):
+            logger.warning("Rejecting webhook payload that exceeds size limits")
+            return None
         try:
-            entry = data.get("entry", [{}])[0]
-            messaging = entry.get("messaging", [{}])[0]
-            
-            sender_id = messaging.get("sender", {}).get("id")
-            message = messaging.get("message", {}).get("text")
-            
-            if sender_id and message:
-                logger.info(f"Received message from {sender_id}: {message}")
-                return {
-                    "sender_id": sender_id,
-                    "message": message,
-                    "timestamp": datetime.now().isoformat()
-                }
-            
+            messaging = _MESSAGING_ADAPTER.validate_python(data["entry"][0]["messaging"][0])
+        except (KeyError, IndexError, TypeError, ValidationError):
+            # Not a text message event
             return None
-            
-        except Exception as e:
-            logger.error(f"Error processing webhook: {str(e)}")
-            return None 
\ No newline at end of file
+        
+        sender_id = messaging["sender"]["id"]
+        message = messaging["message"]["text"]
+        logger.info(f"Received message from {sender_id}: {message}")
+        return {
+            "sender_id": sender_id,
+            "message": message,
+            "timestamp": datetime.now().isoformat()
+        } 
\ No newline at end of file
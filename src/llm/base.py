@@ -2,13 +2,19 @@
 Base LLM client implementation.
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Dict, Any, Optional
 from pydantic import BaseModel
 
-class Message(BaseModel):
+@dataclass(slots=True, frozen=True)
+class Message:
     """Message model for LLM interactions."""
     role: str
     content: str
+    
+    def as_dict(self) -> Dict[str, str]:
+        """Return the chat API payload form of this message."""
+        return {"role": self.role, "content": self.content}
 
 class LLMResponse(BaseModel):
     """Standard response model for LLM outputs."""
@@ -29,6 +35,17 @@ class BaseLLMClient(ABC):
         """Generate a response from the LLM."""
         pass
 
+    @abstractmethod
+    def stream_response(
+        self,
+        messages: List[Message],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream a response from the LLM as text chunks."""
+        pass
+
     @abstractmethod
     async def generate_structured_response(
         self,
@@ -39,4 +56,9 @@ class BaseLLMClient(ABC):
         **kwargs
     ) -> BaseModel:
         """Generate a structured response from the LLM."""
-        pass 
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts into vectors, one per input text."""
+        pass
\ No newline at end of file
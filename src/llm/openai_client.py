@@ -1,28 +1,44 @@
 """
 OpenAI client implementation.
 """
-from typing import List, Dict, Any, Optional
-import json
+from functools import lru_cache
+from typing import AsyncIterator, List, Dict, Any, Optional
+import httpx
+import orjson
 from openai import AsyncOpenAI
 from pydantic import BaseModel
 
 from .base import BaseLLMClient, Message, LLMResponse
+from ..utils.cache import LRUCache
 from ..config import (
     OPENAI_API_KEY,
     OPENAI_MODEL,
     OPENAI_TEMPERATURE,
-    OPENAI_MAX_TOKENS
+    OPENAI_MAX_TOKENS,
+    OPENAI_EMBEDDING_MODEL,
+    LLM_CACHE_SIZE
 )
 
+@lru_cache(maxsize=128)
+def _system_msg_for(response_model: type[BaseModel]) -> Message:
+    """Build the JSON-enforcing system message for a model once."""
+    return Message(
+        role="system",
+        content="You must respond with valid JSON that matches the following Pydantic model structure: "
+               f"{orjson.dumps(response_model.model_json_schema()).decode()}"
+    )
+
 class OpenAIClient(BaseLLMClient):
     """OpenAI client implementation."""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         """Initialize OpenAI client."""
-        self.client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        self.client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
         self.model = OPENAI_MODEL
         self.default_temperature = OPENAI_TEMPERATURE
         self.default_max_tokens = OPENAI_MAX_TOKENS
+        self.embedding_model = OPENAI_EMBEDDING_MODEL
+        self.structured_cache: LRUCache[BaseModel] = LRUCache(LLM_CACHE_SIZE)
 
     async def generate_response(
         self,
@@ -34,7 +50,7 @@ class OpenAIClient(BaseLLMClient):
         """Generate a response from OpenAI."""
         response = await self.client.chat.completions.create(
             model=self.model,
-            messages=[msg.dict() for msg in messages],
+            messages=[msg.as_dict() for msg in messages],
             temperature=temperature or self.default_temperature,
             max_tokens=max_tokens or self.default_max_tokens,
             **kwargs
@@ -45,6 +61,26 @@ class OpenAIClient(BaseLLMClient):
             raw_response=response
         )
 
+    async def stream_response(
+        self,
+        messages: List[Message],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream a response from OpenAI as text chunks."""
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[msg.as_dict() for msg in messages],
+            temperature=temperature or self.default_temperature,
+            max_tokens=max_tokens or self.default_max_tokens,
+            stream=True,
+            **kwargs
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
     async def generate_structured_response(
         self,
         messages: List[Message],
@@ -54,13 +90,17 @@ class OpenAIClient(BaseLLMClient):
         **kwargs
     ) -> BaseModel:
         """Generate a structured response from OpenAI."""
+        # Identical requests get the same answer without another API round trip;
+        # extra request options are not part of the key, so they bypass the cache
+        cache_key = None
+        if not kwargs:
+            cache_key = (self.model, tuple(messages), response_model, temperature, max_tokens)
+            cached = self.structured_cache.get(cache_key)
+            if cached is not None:
+                return cached.model_copy(deep=True)
+        
         # Add system message to enforce JSON output
-        system_msg = Message(
-            role="system",
-            content="You must respond with valid JSON that matches the following Pydantic model structure: "
-                   f"{response_model.schema_json()}"
-        )
-        messages = [system_msg] + messages
+        messages = [_system_msg_for(response_model)] + messages
         
         response = await self.generate_response(
             messages=messages,
@@ -72,7 +112,19 @@ class OpenAIClient(BaseLLMClient):
         
         # Parse the response into the model
         try:
-            data = json.loads(response.content)
-            return response_model.parse_obj(data)
+            data = orjson.loads(response.content)
+            result = response_model.model_validate(data)
         except Exception as e:
-            raise ValueError(f"Failed to parse LLM response into {response_model.__name__}: {str(e)}") 
\ No newline at end of file
+            raise ValueError(f"Failed to parse LLM response into {response_model.__name__}: {str(e)}")
+        
+        if cache_key is not None:
+            self.structured_cache.set(cache_key, result.model_copy(deep=True))
+        return result
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with the OpenAI embeddings API."""
+        response = await self.client.embeddings.create(
+            model=self.embedding_model,
+            input=texts
+        )
+        return [item.embedding for item in response.data]
\ No newline at end of file
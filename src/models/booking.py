@@ -3,8 +3,10 @@ Booking-related data models.
 """
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field, validator
-from uuid import UUID, uuid4
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
+from uuid import UUID
+
+from ..utils.ids import uuid7
 
 class Guest(BaseModel):
     """Guest information model."""
@@ -31,7 +33,7 @@ class BookingStatus(BaseModel):
 
 class Booking(BaseModel):
     """Main booking model."""
-    id: UUID = Field(default_factory=uuid4)
+    id: UUID = Field(default_factory=uuid7)
     guest: Guest
     room: RoomDetails
     check_in_date: datetime
@@ -41,10 +43,11 @@ class Booking(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
 
-    @validator("check_out_date")
-    def check_dates(cls, v, values):
+    @field_validator("check_out_date")
+    @classmethod
+    def check_dates(cls, v: datetime, info: ValidationInfo) -> datetime:
         """Validate check-out date is after check-in date."""
-        if "check_in_date" in values and v <= values["check_in_date"]:
+        if "check_in_date" in info.data and v <= info.data["check_in_date"]:
             raise ValueError("Check-out date must be after check-in date")
         return v
 
@@ -65,6 +68,20 @@ class Booking(BaseModel):
         self.status.last_updated = datetime.now()
         self.updated_at = datetime.now()
 
+class BookingCreate(BaseModel):
+    """Request body for creating a booking."""
+    guest: Guest
+    room: RoomDetails
+    check_in_date: datetime
+    check_out_date: datetime
+
+class BookingUpdate(BaseModel):
+    """Request body for updating a booking; omitted fields are kept."""
+    guest: Optional[Guest] = None
+    room: Optional[RoomDetails] = None
+    check_in_date: Optional[datetime] = None
+    check_out_date: Optional[datetime] = None
+
 class BookingModification(BaseModel):
     """Booking modification model."""
     booking_id: UUID
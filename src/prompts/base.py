@@ -1,16 +1,21 @@
 """
 Base prompts for the Hotel Booking AI Agent.
 """
-from typing import Dict, Any
-from pydantic import BaseModel
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Any
 
-class BasePrompt(BaseModel):
-    """Base class for prompts."""
+@dataclass(frozen=True)
+class BasePrompt:
+    """Base class for prompts.
+    
+    ``format(**kwargs)`` renders the template; it is the template's bound
+    ``str.format``, looked up once instead of on every render.
+    """
     template: str
+    format: Callable[..., str] = field(init=False, repr=False, compare=False)
     
-    def format(self, **kwargs) -> str:
-        """Format the prompt template with the given variables."""
-        return self.template.format(**kwargs)
+    def __post_init__(self):
+        object.__setattr__(self, "format", self.template.format)
 
 class SystemPrompts:
     """System prompts for different functionalities."""
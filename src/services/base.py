@@ -2,7 +2,7 @@
 Base service implementation.
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, TypeVar, Generic
+from typing import AsyncIterator, List, Dict, Any, Optional, TypeVar, Generic
 from uuid import UUID
 from pydantic import BaseModel
 
@@ -44,6 +44,11 @@ class BaseService(ABC, Generic[T]):
         """List all items, optionally filtered."""
         pass
     
+    @abstractmethod
+    def iter(self, filters: Optional[Dict[str, Any]] = None) -> AsyncIterator[T]:
+        """Iterate over items one at a time, optionally filtered."""
+        pass
+    
     @abstractmethod
     async def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate input data."""
@@ -1,15 +1,25 @@
 """
 Booking service implementation.
 """
-from datetime import datetime
-from typing import Dict, Any, Optional, List
+import asyncio
+from datetime import date, datetime, time
+from typing import AsyncIterator, Dict, Any, Optional, List, Union
 from uuid import UUID
 
 from .base import BaseService
 from ..models.booking import Booking, Guest, RoomDetails, BookingStatus
 from ..storage.base import BaseStorage
 from ..llm.base import BaseLLMClient, Message
-from ..prompts.base import BookingPrompts, ConfirmationPrompts
+from ..prompts.base import BookingPrompts, ConfirmationPrompts, SystemPrompts
+from ..config import HOTEL_CONFIG
+
+def _to_datetime(value: Union[str, date, datetime]) -> datetime:
+    """Coerce an ISO string, date or datetime into a datetime."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    return datetime.fromisoformat(value)
 
 class BookingService(BaseService[Booking]):
     """Booking service implementation."""
@@ -19,24 +29,39 @@ class BookingService(BaseService[Booking]):
         super().__init__(storage, llm_client)
         self.booking_prompts = BookingPrompts()
         self.confirmation_prompts = ConfirmationPrompts()
+        # Hotel details are fixed, so the agent system prompt is rendered once
+        self.agent_prompt = SystemPrompts.BOOKING_AGENT.format(
+            hotel_name=HOTEL_CONFIG["name"],
+            hotel_address=HOTEL_CONFIG["address"],
+            check_in_time=HOTEL_CONFIG["check_in_time"],
+            check_out_time=HOTEL_CONFIG["check_out_time"],
+            room_types="\n".join(f"- {name}" for name in HOTEL_CONFIG["room_types"].values()),
+            policies="\n".join(
+                f"- {topic.capitalize()}: {policy}"
+                for topic, policy in HOTEL_CONFIG["policies"].items()
+            )
+        )
     
     async def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate booking data."""
         # Validate dates
-        check_in = datetime.fromisoformat(data["check_in_date"])
-        check_out = datetime.fromisoformat(data["check_out_date"])
+        if data.get("check_in_date") is None or data.get("check_out_date") is None:
+            raise ValueError("Check-in and check-out dates are required")
+        check_in = _to_datetime(data["check_in_date"])
+        check_out = _to_datetime(data["check_out_date"])
         if check_out <= check_in:
             raise ValueError("Check-out date must be after check-in date")
         
         # Validate guest information
-        if not data.get("guest", {}).get("email"):
+        if not (data.get("guest") or {}).get("email"):
             raise ValueError("Guest email is required")
         
         # Validate room details
-        if data.get("room", {}).get("num_adults", 0) < 1:
+        if (data.get("room") or {}).get("num_adults", 0) < 1:
             raise ValueError("At least one adult guest is required")
         
-        return data
+        # Hand back the parsed dates so callers don't parse them again
+        return {**data, "check_in_date": check_in, "check_out_date": check_out}
     
     async def create(self, data: Dict[str, Any]) -> Booking:
         """Create a new booking."""
@@ -46,17 +71,16 @@ class BookingService(BaseService[Booking]):
         # Create models
         guest = Guest(**validated_data["guest"])
         room = RoomDetails(**validated_data["room"])
+        check_in = validated_data["check_in_date"]
+        check_out = validated_data["check_out_date"]
         
         # Create booking
         booking = Booking(
             guest=guest,
             room=room,
-            check_in_date=datetime.fromisoformat(validated_data["check_in_date"]),
-            check_out_date=datetime.fromisoformat(validated_data["check_out_date"]),
-            total_amount=room.rate * (
-                datetime.fromisoformat(validated_data["check_out_date"]) -
-                datetime.fromisoformat(validated_data["check_in_date"])
-            ).days
+            check_in_date=check_in,
+            check_out_date=check_out,
+            total_amount=room.rate * (check_out - check_in).days
         )
         
         # Store booking
@@ -74,20 +98,20 @@ class BookingService(BaseService[Booking]):
             raise ValueError(f"Booking {id} not found")
         
         # Validate data
-        validated_data = await self.validate({**booking.dict(), **data})
+        validated_data = await self.validate({**booking.model_dump(), **data})
         
         # Update booking
+        room = RoomDetails(**validated_data["room"])
+        check_in = validated_data["check_in_date"]
+        check_out = validated_data["check_out_date"]
         updated_booking = Booking(
             id=booking.id,
             guest=Guest(**validated_data["guest"]),
-            room=RoomDetails(**validated_data["room"]),
-            check_in_date=datetime.fromisoformat(validated_data["check_in_date"]),
-            check_out_date=datetime.fromisoformat(validated_data["check_out_date"]),
+            room=room,
+            check_in_date=check_in,
+            check_out_date=check_out,
             status=booking.status,
-            total_amount=RoomDetails(**validated_data["room"]).rate * (
-                datetime.fromisoformat(validated_data["check_out_date"]) -
-                datetime.fromisoformat(validated_data["check_in_date"])
-            ).days,
+            total_amount=room.rate * (check_out - check_in).days,
             created_at=booking.created_at
         )
         
@@ -102,6 +126,10 @@ class BookingService(BaseService[Booking]):
         """List all bookings, optionally filtered."""
         return await self.storage.list(filters)
     
+    def iter(self, filters: Optional[Dict[str, Any]] = None) -> AsyncIterator[Booking]:
+        """Iterate over bookings one at a time, optionally filtered."""
+        return self.storage.iter(filters)
+    
     async def confirm_booking(self, id: UUID) -> Booking:
         """Confirm a booking."""
         booking = await self.get(id)
@@ -114,8 +142,8 @@ class BookingService(BaseService[Booking]):
         
         return await self.storage.update(id, booking)
     
-    async def generate_confirmation_message(self, booking: Booking) -> str:
-        """Generate a confirmation message for a booking."""
+    def stream_confirmation_message(self, booking: Booking) -> AsyncIterator[str]:
+        """Stream a confirmation message for a booking as it is generated."""
         prompt = self.confirmation_prompts.BOOKING_SUMMARY.format(
             booking_id=booking.id,
             guest_name=booking.guest.name,
@@ -129,8 +157,27 @@ class BookingService(BaseService[Booking]):
             total_amount=booking.total_amount
         )
         
-        response = await self.llm_client.generate_response(
-            messages=[Message(role="user", content=prompt)]
+        return self.llm_client.stream_response(
+            messages=[
+                Message(role="system", content=self.agent_prompt),
+                Message(role="user", content=prompt)
+            ]
         )
+    
+    async def generate_confirmation_message(self, booking: Booking) -> str:
+        """Generate a confirmation message for a booking."""
+        return "".join([chunk async for chunk in self.stream_confirmation_message(booking)])
+    
+    async def generate_confirmation_messages(
+        self,
+        bookings: List[Booking],
+        concurrency: int = 10
+    ) -> List[str]:
+        """Generate confirmation messages for many bookings concurrently."""
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def generate_one(booking: Booking) -> str:
+            async with semaphore:
+                return await self.generate_confirmation_message(booking)
         
-        return response.content 
\ No newline at end of file
+        return await asyncio.gather(*(generate_one(booking) for booking in bookings))
\ No newline at end of file
@@ -1,24 +1,35 @@
 """
 State management module for the Hotel Booking AI Agent using LangGraph.
 """
-from typing import Dict, List, Optional, Tuple, TypedDict, Literal
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, TypedDict, Literal
 from datetime import datetime
-from pydantic import BaseModel, Field
-from langgraph.graph import Graph, StateGraph
-from langchain.prompts import ChatPromptTemplate
-from langchain_groq import ChatGroq
+from functools import lru_cache
+from operator import attrgetter
+from pydantic import BaseModel, ConfigDict, Field
 from loguru import logger
 from config import GROQ_API_KEY, logger
 
+if TYPE_CHECKING:
+    # LangChain and LangGraph are slow to import; only the graph builders need them
+    from langgraph.graph import StateGraph
+    from langchain_groq import ChatGroq
+
 # State Definitions
+# Validators are built on first use rather than at import; internal copies
+# that need no validation should go through model_construct. States are
+# immutable; graph handlers return a dict of the fields they change
+_STATE_MODEL_CONFIG = ConfigDict(defer_build=True, frozen=True)
+
 class UserInfo(BaseModel):
     """User information for booking."""
+    model_config = _STATE_MODEL_CONFIG
     name: Optional[str] = None
     email: Optional[str] = None
     phone: Optional[str] = None
 
 class BookingDetails(BaseModel):
     """Details for a hotel booking."""
+    model_config = _STATE_MODEL_CONFIG
     check_in_date: Optional[datetime] = None
     check_out_date: Optional[datetime] = None
     room_type: Optional[str] = None
@@ -29,6 +40,7 @@ class BookingDetails(BaseModel):
 
 class ConversationState(BaseModel):
     """Complete state of the conversation."""
+    model_config = _STATE_MODEL_CONFIG
     current_state: str = "initial"
     user_info: UserInfo = Field(default_factory=UserInfo)
     booking_details: BookingDetails = Field(default_factory=BookingDetails)
@@ -38,19 +50,24 @@ class ConversationState(BaseModel):
     error_context: Optional[str] = None
 
 # State Graph Configuration
-def create_state_graph() -> StateGraph:
-    """Create the state management graph using LangGraph."""
+@lru_cache(maxsize=None)
+def get_llm() -> "ChatGroq":
+    """Return the shared Groq client so its connection pool is reused."""
+    from langchain_groq import ChatGroq
     
-    # Initialize LLM
-    llm = ChatGroq(
+    return ChatGroq(
         api_key=GROQ_API_KEY,
         model_name="mixtral-8x7b-32768",
         temperature=0.7,
         max_tokens=1000
     )
 
-    # Define state transitions
-    workflow = StateGraph(nodes=["initial", "identify_intent", "collect_info", "confirm_booking", "handle_error"])
+def create_state_graph() -> "StateGraph":
+    """Create the state management graph using LangGraph."""
+    from langgraph.graph import END, StateGraph
+    
+    # Nodes receive the state coerced to ConversationState
+    workflow = StateGraph(ConversationState)
 
     # Add nodes with their respective handlers
     workflow.add_node("initial", initial_handler)
@@ -60,63 +77,90 @@ def create_state_graph() -> StateGraph:
     workflow.add_node("handle_error", handle_error_handler)
 
     # Define edges
+    workflow.set_entry_point("initial")
     workflow.add_edge("initial", "identify_intent")
-    workflow.add_edge("identify_intent", "collect_info")
     workflow.add_edge("collect_info", "confirm_booking")
-    workflow.add_edge("confirm_booking", "collect_info")  # For modifications
-    workflow.add_edge("*", "handle_error")  # Error handling from any state
+    # A modification comes back in as a new message, not as a loop in the graph
+    workflow.add_edge("confirm_booking", END)
+    workflow.add_edge("handle_error", END)
     
     # Conditional edges
     workflow.add_conditional_edges(
         "identify_intent",
-        lambda x: "collect_info" if x.get("intent") in ["booking", "rescheduling"] else "handle_questions"
+        _route_intent,
+        {"collect_info": "collect_info", "handle_error": "handle_error", END: END}
     )
 
     return workflow
 
+def _route_intent(state: Dict[str, Any]) -> str:
+    """Pick the node after intent identification; errors win over intents."""
+    from langgraph.graph import END
+    
+    if state.get("error_context"):
+        return "handle_error"
+    if state.get("intent") in ("booking", "rescheduling"):
+        return "collect_info"
+    # Questions are answered outside the booking graph
+    return END
+
+@lru_cache(maxsize=None)
+def get_state_graph():
+    """Return the compiled state graph, building it on first use."""
+    return create_state_graph().compile()
+
 # State Handlers
-async def initial_handler(state: ConversationState) -> ConversationState:
+async def initial_handler(state: ConversationState) -> Dict[str, Any]:
     """Handle initial state and setup."""
     logger.info(f"Entering initial state handler")
-    state.current_state = "initial"
-    return state
+    return {"current_state": "initial"}
 
-async def identify_intent_handler(state: ConversationState) -> ConversationState:
+async def identify_intent_handler(state: ConversationState) -> Dict[str, Any]:
     """Identify user intent from message."""
     logger.info(f"Identifying intent from message: {state.last_user_message}")
     # Intent classification logic here
-    return state
+    return {"current_state": "identify_intent"}
 
-async def collect_info_handler(state: ConversationState) -> ConversationState:
+async def collect_info_handler(state: ConversationState) -> Dict[str, Any]:
     """Collect necessary information based on intent."""
     logger.info(f"Collecting information for intent: {state.intent}")
     # Information collection logic here
-    return state
+    return {"current_state": "collect_info"}
 
-async def confirm_booking_handler(state: ConversationState) -> ConversationState:
+async def confirm_booking_handler(state: ConversationState) -> Dict[str, Any]:
     """Confirm booking details and finalize."""
     logger.info(f"Confirming booking: {state.booking_details}")
     # Booking confirmation logic here
-    return state
+    return {"current_state": "confirm_booking"}
 
-async def handle_error_handler(state: ConversationState) -> ConversationState:
+async def handle_error_handler(state: ConversationState) -> Dict[str, Any]:
     """Handle errors and exceptions."""
     logger.error(f"Error in state {state.current_state}: {state.error_context}")
     # Error handling logic here
-    return state
+    return {"current_state": "handle_error"}
 
 # Helper functions for state transitions
+_MISSING_BOOKING_INFO = "Missing required booking information"
+
+# Results keyed by (check_out <= check_in) << 1 | (check_in < now); an
+# inverted range is reported ahead of a past check-in
+_DATE_RESULTS = {
+    0b00: (True, ""),
+    0b01: (False, "Check-in date cannot be in the past"),
+    0b10: (False, "Check-out date must be after check-in date"),
+    0b11: (False, "Check-out date must be after check-in date"),
+}
+
 def validate_dates(check_in: datetime, check_out: datetime) -> Tuple[bool, str]:
     """Validate booking dates."""
-    if check_in >= check_out:
-        return False, "Check-out date must be after check-in date"
-    if check_in < datetime.now():
-        return False, "Check-in date cannot be in the past"
-    return True, ""
+    return _DATE_RESULTS[(check_in >= check_out) << 1 | (check_in < datetime.now())]
+
+_required_booking_fields = attrgetter(
+    "check_in_date", "check_out_date", "room_type", "num_adults"
+)
 
 def validate_booking_details(booking: BookingDetails) -> Tuple[bool, str]:
     """Validate complete booking details."""
-    if not all([booking.check_in_date, booking.check_out_date, booking.room_type,
-                booking.num_adults]):
-        return False, "Missing required booking information"
+    if not all(_required_booking_fields(booking)):
+        return False, _MISSING_BOOKING_INFO
     return validate_dates(booking.check_in_date, booking.check_out_date) 
\ No newline at end of file
@@ -2,7 +2,7 @@
 Base storage implementation.
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, TypeVar, Generic
+from typing import AsyncIterator, List, Dict, Any, Optional, TypeVar, Generic
 from uuid import UUID
 from pydantic import BaseModel
 
@@ -16,6 +16,11 @@ class BaseStorage(ABC, Generic[T]):
         """Create a new item."""
         pass
     
+    @abstractmethod
+    async def create_many(self, items: List[T]) -> List[T]:
+        """Create several items in one write."""
+        pass
+    
     @abstractmethod
     async def get(self, id: UUID) -> Optional[T]:
         """Get an item by ID."""
@@ -36,6 +41,11 @@ class BaseStorage(ABC, Generic[T]):
         """List all items, optionally filtered."""
         pass
     
+    @abstractmethod
+    def iter(self, filters: Optional[Dict[str, Any]] = None) -> AsyncIterator[T]:
+        """Iterate over items one at a time, optionally filtered."""
+        pass
+    
     @abstractmethod
     async def exists(self, id: UUID) -> bool:
         """Check if an item exists."""
@@ -1,95 +1,408 @@
 """
 JSON file storage implementation.
+
+Items are kept in an in-memory index loaded once at startup. Writes are
+applied to the index immediately and handed to a background flusher, which
+appends everything queued since its last pass to a JSON-lines write-ahead log
+with a single fsync and periodically compacts the log back into the base file.
+Before each operation the files are stat'ed, and the index is reloaded in a
+worker thread if another process (e.g. a second server worker) has written to
+them since; when only the log grew, just the new entries are replayed.
+Processes coordinate through an flock on a sidecar ``.lock`` file: writers
+hold it exclusively from the staleness check through append and compaction,
+readers hold it shared while loading.
+
+Rows are validated once on the way in, by ``create``/``update`` or at load
+time, so reads can rebuild models with ``model_construct`` and skip validation.
 """
-import json
+import os
 import asyncio
+import copy
+import fcntl
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Type
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional, Tuple, Type, get_args
 from uuid import UUID
-from pydantic import BaseModel
+import orjson
+from loguru import logger
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from .base import BaseStorage, T
 
+@lru_cache(maxsize=None)
+def _nested_models(model_class: Type[BaseModel]) -> Dict[str, Type[BaseModel]]:
+    """Map field names to their model type for fields holding a nested model."""
+    nested = {}
+    for name, field in model_class.model_fields.items():
+        # Unwrap Optional[Model] to Model
+        for candidate in (field.annotation, *get_args(field.annotation)):
+            if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+                nested[name] = candidate
+                break
+    return nested
+
+_MISSING = object()
+
+def _compile_filters(filters: Dict[str, Any]) -> Tuple[Tuple[Tuple[str, ...], Any], ...]:
+    """Split filter keys into paths once per query; "guest.email" reads a nested field."""
+    return tuple((tuple(key.split(".")), value) for key, value in filters.items())
+
+def _matches(item: Dict[str, Any], filters: Tuple[Tuple[Tuple[str, ...], Any], ...]) -> bool:
+    """Check whether an item matches all compiled filters."""
+    for path, value in filters:
+        current = item
+        for key in path:
+            current = current.get(key, _MISSING) if isinstance(current, dict) else _MISSING
+        if current != value:
+            return False
+    return True
+
+def _construct(model_class: Type[T], data: Dict[str, Any]) -> T:
+    """Build a model from already validated python-mode data without validating."""
+    nested = _nested_models(model_class)
+    values = {}
+    for key, value in data.items():
+        if key in nested and isinstance(value, dict):
+            value = _construct(nested[key], value)
+        elif isinstance(value, (dict, list)):
+            # Don't let callers mutate the index through the returned model
+            value = copy.deepcopy(value)
+        values[key] = value
+    return model_class.model_construct(**values)
+
 class JSONStorage(BaseStorage[T]):
     """JSON file storage implementation."""
     
-    def __init__(self, file_path: Path, model_class: Type[T]):
+    def __init__(
+        self,
+        file_path: Path,
+        model_class: Type[T],
+        compact_every: int = 500,
+        trust_data: bool = True,
+        flush_interval: float = 0.0
+    ):
         """Initialize JSON storage."""
         self.file_path = file_path
+        self.wal_path = file_path.with_suffix(".wal")
+        self.lock_path = file_path.with_suffix(".lock")
         self.model_class = model_class
-        self.lock = asyncio.Lock()
-        self._ensure_file_exists()
+        self._list_adapter = TypeAdapter(List[model_class])
+        self.compact_every = compact_every
+        self.trust_data = trust_data
+        self.flush_interval = flush_interval
+        self._writes_since_compaction = 0
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._dirty = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self._closed = False
+        self._flushing = False
+        self._writes = 0
+        self._reload_lock = asyncio.Lock()
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._locked(fcntl.LOCK_EX):
+            self._ensure_file_exists()
+            self._index: Dict[str, Dict[str, Any]] = self._load()
+            self._disk: Optional[Tuple[int, ...]] = self._disk_state()
+    
+    @contextmanager
+    def _locked(self, operation: int) -> Iterator[None]:
+        """Hold the cross-process file lock (LOCK_SH or LOCK_EX)."""
+        with self.lock_path.open("ab") as lock:
+            fcntl.flock(lock, operation)
+            # Closing the file releases the lock
+            yield
     
     def _ensure_file_exists(self):
         """Ensure the JSON file exists."""
         if not self.file_path.exists():
-            self.file_path.parent.mkdir(parents=True, exist_ok=True)
             self.file_path.write_text("[]")
     
-    async def _read_data(self) -> List[Dict[str, Any]]:
-        """Read data from JSON file."""
-        async with self.lock:
-            return json.loads(self.file_path.read_text())
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Load the base file and replay the write-ahead log on top of it."""
+        rows = orjson.loads(self.file_path.read_bytes())
+        try:
+            # Validate the whole file in one pass; only fall back to row by row
+            # to find and skip the bad rows
+            models = self._list_adapter.validate_python(rows)
+            index = {row["id"]: model.model_dump() for row, model in zip(rows, models)}
+        except ValidationError:
+            index = {}
+            for row in rows:
+                try:
+                    model = self.model_class.model_validate(row)
+                except ValidationError as e:
+                    logger.warning(f"Skipping invalid row in {self.file_path}: {str(e)}")
+                    continue
+                index[row["id"]] = model.model_dump()
+        
+        self._apply(index, self._read_wal())
+        return index
+    
+    def _read_wal(self, offset: int = 0) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Read the log from a byte offset as (id, item) changes; item is None for deletes."""
+        changes = []
+        if not self.wal_path.exists():
+            return changes
+        with self.wal_path.open("rb") as wal:
+            wal.seek(offset)
+            for line in wal:
+                try:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    # A torn final line from a crash mid-append
+                    logger.warning(f"Skipping unreadable line in {self.wal_path}")
+                    continue
+                if entry["op"] == "delete":
+                    changes.append((entry["id"], None))
+                else:
+                    item = self.model_class.model_validate(entry["item"])
+                    changes.append((entry["id"], item.model_dump()))
+        return changes
+    
+    @staticmethod
+    def _apply(index: Dict[str, Dict[str, Any]], changes: List[Tuple[str, Optional[Dict[str, Any]]]]):
+        """Apply log changes to an index."""
+        for id, item in changes:
+            if item is None:
+                index.pop(id, None)
+            else:
+                index[id] = item
+    
+    def _disk_state(self) -> Tuple[int, ...]:
+        """Cheap fingerprint of the base file and log, changed by any write."""
+        base = os.stat(self.file_path)
+        try:
+            wal = os.stat(self.wal_path)
+        except FileNotFoundError:
+            return (base.st_mtime_ns, base.st_size, 0, 0)
+        return (base.st_mtime_ns, base.st_size, wal.st_mtime_ns, wal.st_size)
     
-    async def _write_data(self, data: List[Dict[str, Any]]):
-        """Write data to JSON file."""
-        async with self.lock:
-            self.file_path.write_text(json.dumps(data, indent=2))
+    def _read_changes(
+        self,
+        seen: Optional[Tuple[int, ...]]
+    ) -> Tuple[Tuple[int, ...], Optional[Dict[str, Dict[str, Any]]], List[Tuple[str, Optional[Dict[str, Any]]]]]:
+        """Read what changed on disk since the seen fingerprint.
+        
+        Returns the new fingerprint with either a freshly loaded index, or None
+        and the log entries appended after the seen log size.
+        """
+        with self._locked(fcntl.LOCK_SH):
+            # Fingerprint under the lock so it matches what was read
+            disk = self._disk_state()
+            if seen is not None and disk[:2] == seen[:2] and disk[3] >= seen[3]:
+                # Base file untouched, so the log only grew: replay just the tail
+                return disk, None, self._read_wal(seen[3])
+            return disk, self._load(), []
+    
+    async def _refresh(self):
+        """Reload the index if the files were changed by someone else."""
+        if self._pending or self._flushing:
+            # Our own writes are on their way to disk; the index is ahead of it
+            return
+        if self._disk_state() == self._disk:
+            return
+        async with self._reload_lock:
+            # Another caller may have caught up while we waited
+            if self._pending or self._flushing or self._disk_state() == self._disk:
+                return
+            writes = self._writes
+            disk, index, changes = await asyncio.to_thread(self._read_changes, self._disk)
+            if self._writes != writes:
+                # A write landed in the index meanwhile; what was read is older
+                # than it, so leave the reload to a later call
+                return
+            if index is None:
+                self._apply(self._index, changes)
+            else:
+                self._index = index
+            self._disk = disk
+    
+    def _append_wal(self, entries: List[Dict[str, Any]]):
+        """Durably append a batch of entries to the write-ahead log."""
+        with self.wal_path.open("ab") as wal:
+            wal.write(b"".join(orjson.dumps(entry) + b"\n" for entry in entries))
+            wal.flush()
+            os.fsync(wal.fileno())
+    
+    def _write_base(self, data: List[Dict[str, Any]]):
+        """Atomically replace the base file and truncate the log."""
+        tmp_path = self.file_path.with_suffix(".tmp")
+        with tmp_path.open("wb") as tmp:
+            # Compact output: the base file is a machine format, not for reading
+            tmp.write(orjson.dumps(data))
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_path, self.file_path)
+        self.wal_path.unlink(missing_ok=True)
+    
+    def _write_batch(
+        self,
+        entries: List[Dict[str, Any]],
+        snapshot: Optional[List[Dict[str, Any]]]
+    ) -> Optional[Tuple[int, ...]]:
+        """Persist one flusher pass: the queued log entries, then an optional compaction.
+        
+        Returns the resulting disk state, or None if another process wrote in
+        the meantime and the index must be reloaded.
+        """
+        # Held from the staleness check through the log truncation, so no other
+        # writer can append an entry that the compaction would then discard
+        with self._locked(fcntl.LOCK_EX):
+            stale = self._disk_state() != self._disk
+            if entries:
+                self._append_wal(entries)
+            if stale:
+                # Compacting now would drop the other writer's entries
+                return None
+            if snapshot is not None:
+                self._write_base(snapshot)
+            return self._disk_state()
+    
+    def _log(self, op: str, id: str, item: Optional[Dict[str, Any]] = None) -> asyncio.Future:
+        """Apply a write to the index and queue it for the log.
+        
+        The returned future resolves once the entry is durable on disk.
+        """
+        if self._closed:
+            # The flusher has exited, so nothing would ever resolve the future
+            raise RuntimeError(f"Storage {self.file_path} is closed")
+        if op == "delete":
+            del self._index[id]
+        else:
+            self._index[id] = item
+        
+        self._writes += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(({"op": op, "id": id, "item": item}, future))
+        self._writes_since_compaction += 1
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+        self._dirty.set()
+        return future
+    
+    async def _flush_loop(self):
+        """Write queued entries in batches until the storage is closed."""
+        while True:
+            await self._dirty.wait()
+            if self.flush_interval:
+                # Let a burst of writes pile up into one batch
+                await asyncio.sleep(self.flush_interval)
+            self._dirty.clear()
+            batch, self._pending = self._pending, []
+            
+            # Snapshot in the same step as the drain so a compacted base file
+            # never runs ahead of the log it replaces
+            snapshot = None
+            if self._writes_since_compaction >= self.compact_every:
+                self._writes_since_compaction = 0
+                snapshot = list(self._index.values())
+            
+            self._flushing = True
+            try:
+                self._disk = await asyncio.to_thread(
+                    self._write_batch, [entry for entry, _ in batch], snapshot
+                )
+            except Exception as e:
+                logger.error(f"Error writing {self.wal_path}: {str(e)}")
+                # Reload from disk next time rather than serve unlogged writes
+                self._disk = None
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+            finally:
+                self._flushing = False
+            
+            if self._closed and not self._pending:
+                self._flusher = None
+                return
+    
+    async def aclose(self):
+        """Drain queued writes and compact the log before shutdown."""
+        self._closed = True
+        if self._flusher is not None:
+            self._dirty.set()
+            await self._flusher
+        await self._refresh()
+        if self._writes_since_compaction:
+            self._writes_since_compaction = 0
+            self._disk = await asyncio.to_thread(
+                self._write_batch, [], list(self._index.values())
+            )
     
     async def create(self, item: T) -> T:
         """Create a new item."""
-        data = await self._read_data()
-        item_dict = item.dict()
-        data.append(item_dict)
-        await self._write_data(data)
+        await self._refresh()
+        item_dict = item.model_dump()
+        await self._log("put", str(item_dict["id"]), item_dict)
         return item
     
+    async def create_many(self, items: List[T]) -> List[T]:
+        """Create several items; they reach the log in a single flusher batch."""
+        await self._refresh()
+        futures = []
+        for item in items:
+            item_dict = item.model_dump()
+            futures.append(self._log("put", str(item_dict["id"]), item_dict))
+        await asyncio.gather(*futures)
+        return items
+    
     async def get(self, id: UUID) -> Optional[T]:
         """Get an item by ID."""
-        data = await self._read_data()
-        for item in data:
-            if item["id"] == str(id):
-                return self.model_class.parse_obj(item)
-        return None
+        await self._refresh()
+        item = self._index.get(str(id))
+        if item is None:
+            return None
+        return self._to_model(item)
     
     async def update(self, id: UUID, item: T) -> T:
         """Update an existing item."""
-        data = await self._read_data()
-        for i, existing in enumerate(data):
-            if existing["id"] == str(id):
-                item_dict = item.dict()
-                data[i] = item_dict
-                await self._write_data(data)
-                return item
-        raise ValueError(f"Item with ID {id} not found")
+        await self._refresh()
+        if str(id) not in self._index:
+            raise ValueError(f"Item with ID {id} not found")
+        await self._log("put", str(id), item.model_dump())
+        return item
     
     async def delete(self, id: UUID) -> bool:
         """Delete an item by ID."""
-        data = await self._read_data()
-        original_length = len(data)
-        data = [item for item in data if item["id"] != str(id)]
-        if len(data) < original_length:
-            await self._write_data(data)
-            return True
-        return False
+        await self._refresh()
+        if str(id) not in self._index:
+            return False
+        await self._log("delete", str(id))
+        return True
     
     async def list(self, filters: Optional[Dict[str, Any]] = None) -> List[T]:
         """List all items, optionally filtered."""
-        data = await self._read_data()
+        await self._refresh()
+        data = list(self._index.values())
         if filters:
-            filtered_data = []
-            for item in data:
-                match = True
-                for key, value in filters.items():
-                    if key not in item or item[key] != value:
-                        match = False
-                        break
-                if match:
-                    filtered_data.append(item)
-            data = filtered_data
-        return [self.model_class.parse_obj(item) for item in data]
+            compiled = _compile_filters(filters)
+            data = [item for item in data if _matches(item, compiled)]
+        if self.trust_data:
+            return [_construct(self.model_class, item) for item in data]
+        # One call into pydantic-core for the whole list instead of one per row
+        return self._list_adapter.validate_python(data)
+    
+    async def iter(self, filters: Optional[Dict[str, Any]] = None) -> AsyncIterator[T]:
+        """Iterate over items one at a time, optionally filtered."""
+        await self._refresh()
+        compiled = _compile_filters(filters) if filters else ()
+        for item in list(self._index.values()):
+            if not _matches(item, compiled):
+                continue
+            yield self._to_model(item)
+    
+    def _to_model(self, item: Dict[str, Any]) -> T:
+        """Rebuild a model from an index row."""
+        if self.trust_data:
+            return _construct(self.model_class, item)
+        return self.model_class.model_validate(item)
     
     async def exists(self, id: UUID) -> bool:
         """Check if an item exists."""
-        data = await self._read_data()
-        return any(item["id"] == str(id) for item in data) 
\ No newline at end of file
+        await self._refresh()
+        return str(id) in self._index
@@ -0,0 +1,37 @@
+"""
+In-process caching utilities.
+"""
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+class LRUCache(Generic[V]):
+    """Bounded mapping that evicts the least recently used entry."""
+    
+    def __init__(self, maxsize: int = 1024):
+        """Initialize LRU cache."""
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, V] = OrderedDict()
+    
+    def get(self, key: Hashable) -> Optional[V]:
+        """Get a cached value, marking it as recently used."""
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            return None
+        return self._data[key]
+    
+    def set(self, key: Hashable, value: V) -> None:
+        """Cache a value, evicting the oldest entry when full."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove all cached values."""
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
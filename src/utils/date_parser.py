@@ -1,76 +1,91 @@
 """
 Date parsing utility for extracting dates from user messages.
 """
+from functools import lru_cache
 from typing import Dict, Optional, Tuple
 from datetime import datetime, date
 from dateutil.parser import parse
 from dateutil.relativedelta import relativedelta
 import re
 
+# One union over every supported format so a message is scanned once. Longer
+# formats come first so "2025-03-01" is not also read as "25-03-01".
+_DATE_RE = re.compile("|".join([
+    # YYYY-MM-DD
+    r'(?P<iso>\d{4}-\d{1,2}-\d{1,2})',
+    # DD/MM/YYYY or MM/DD/YYYY
+    r'(?P<numeric>\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
+    # Month DD, YYYY
+    r'(?P<month_day>[a-z]+\s+\d{1,2},?\s+\d{4})',
+    # DD Month YYYY
+    r'(?P<day_month>\d{1,2}\s+[a-z]+\s+\d{4})',
+    # Tomorrow, next week, etc.
+    r'(?P<relative>tomorrow|next week|next month)',
+    # X days/weeks from now
+    r'(?P<number>\d+)\s+(?P<unit>day|week|month)s?\s+from\s+(?:now|today)',
+]))
+
+_RELATIVE_DATES = {
+    "tomorrow": relativedelta(days=1),
+    "next week": relativedelta(weeks=1),
+    "next month": relativedelta(months=1),
+}
+
+# Numeric layouts tried with strptime before falling back to dateutil, in the
+# same month-first order dateutil uses
+_NUMERIC_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m-%d-%Y")
+
+def _parse_absolute(date_str: str, numeric: bool) -> date:
+    """Parse one matched date, using strptime where it can stand in for dateutil."""
+    if numeric:
+        for fmt in _NUMERIC_FORMATS:
+            try:
+                return datetime.strptime(date_str, fmt).date()
+            except ValueError:
+                continue
+    return parse(date_str).date()
+
 class DateParser:
     """Utility class for parsing dates from text."""
     
     @staticmethod
-    def extract_dates(text: str) -> Optional[Dict[str, date]]:
+    def extract_dates(text: str, now: Optional[datetime] = None) -> Optional[Dict[str, date]]:
         """
         Extract check-in and check-out dates from text.
         
         Args:
             text (str): Text containing date information
+            now (Optional[datetime]): Current time, read from the clock if omitted
             
         Returns:
             Optional[Dict[str, date]]: Dictionary with check_in and check_out dates,
                                      or None if dates couldn't be extracted
         """
-        # Common date formats
-        date_patterns = [
-            # DD/MM/YYYY or MM/DD/YYYY
-            r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            # YYYY-MM-DD
-            r'(\d{4}-\d{1,2}-\d{1,2})',
-            # Month DD, YYYY
-            r'([A-Za-z]+\s+\d{1,2},?\s+\d{4})',
-            # DD Month YYYY
-            r'(\d{1,2}\s+[A-Za-z]+\s+\d{4})',
-            # Tomorrow, next week, etc.
-            r'(tomorrow|next week|next month)',
-            # X days/weeks from now
-            r'(\d+)\s+(day|week|month)s?\s+from\s+(?:now|today)',
-        ]
-        
+        # Relative dates depend on the current day, so it is part of the cache key
+        dates = DateParser._extract_dates(text, (now or datetime.now()).date())
+        return dict(dates) if dates else None
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _extract_dates(text: str, today: date) -> Optional[Dict[str, date]]:
+        """Extract dates relative to a given day; results are memoized."""
         dates = []
-        text = text.lower()
-        
-        # Extract dates using patterns
-        for pattern in date_patterns:
-            matches = re.finditer(pattern, text)
-            for match in matches:
-                date_str = match.group(1)
-                try:
-                    # Handle relative dates
-                    if date_str == "tomorrow":
-                        parsed_date = datetime.now().date() + relativedelta(days=1)
-                    elif date_str == "next week":
-                        parsed_date = datetime.now().date() + relativedelta(weeks=1)
-                    elif date_str == "next month":
-                        parsed_date = datetime.now().date() + relativedelta(months=1)
-                    elif "from" in match.group(0):
-                        # Handle "X days/weeks from now"
-                        number = int(match.group(1))
-                        unit = match.group(2)
-                        if unit == "day":
-                            parsed_date = datetime.now().date() + relativedelta(days=number)
-                        elif unit == "week":
-                            parsed_date = datetime.now().date() + relativedelta(weeks=number)
-                        elif unit == "month":
-                            parsed_date = datetime.now().date() + relativedelta(months=number)
-                    else:
-                        # Parse absolute dates
-                        parsed_date = parse(date_str).date()
-                    
-                    dates.append(parsed_date)
-                except (ValueError, TypeError):
-                    continue
+        for match in _DATE_RE.finditer(text.lower()):
+            try:
+                if match.group("relative"):
+                    parsed_date = today + _RELATIVE_DATES[match.group("relative")]
+                elif match.group("number"):
+                    # Handle "X days/weeks from now"
+                    number = int(match.group("number"))
+                    parsed_date = today + relativedelta(**{f"{match.group('unit')}s": number})
+                else:
+                    # Parse absolute dates
+                    kind = match.lastgroup
+                    parsed_date = _parse_absolute(match.group(kind), kind in ("iso", "numeric"))
+                
+                dates.append(parsed_date)
+            except (ValueError, TypeError):
+                continue
         
         # Sort dates to determine check-in and check-out
         if len(dates) >= 2:
@@ -83,18 +98,23 @@ class DateParser:
         return None
     
     @staticmethod
-    def is_valid_date_range(check_in: date, check_out: date) -> Tuple[bool, str]:
+    def is_valid_date_range(
+        check_in: date,
+        check_out: date,
+        now: Optional[datetime] = None
+    ) -> Tuple[bool, str]:
         """
         Validate a date range for a hotel booking.
         
         Args:
             check_in (date): Check-in date
             check_out (date): Check-out date
+            now (Optional[datetime]): Current time, read from the clock if omitted
             
         Returns:
             Tuple[bool, str]: (is_valid, error_message)
         """
-        today = datetime.now().date()
+        today = (now or datetime.now()).date()
         
         if check_in < today:
             return False, "Check-in date cannot be in the past"
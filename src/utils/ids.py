@@ -0,0 +1,43 @@
+"""
+Identifier generation utilities.
+"""
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+def uuid7() -> uuid.UUID:
+    """Generate a time-ordered UUIDv7 (RFC 9562).
+    
+    The leading 48 bits are the Unix time in milliseconds and the 12 bits of
+    rand_a hold a counter within the millisecond (RFC 9562 section 6.2,
+    method 1), so IDs from one process sort in creation order as both UUIDs
+    and strings.
+    """
+    global _last_ms, _counter
+    rand_b = int.from_bytes(os.urandom(8), "big") & 0x3FFF_FFFF_FFFF_FFFF
+    with _lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms > _last_ms:
+            _last_ms = timestamp_ms
+            # Random start with the top bit clear, leaving room to count up
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            # Same millisecond, or the clock went back: keep counting
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted; borrow the next millisecond
+                _last_ms += 1
+                _counter = 0
+        timestamp_ms, counter = _last_ms, _counter
+    
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76  # version
+    value |= counter << 64  # rand_a
+    value |= 0b10 << 62  # variant
+    value |= rand_b
+    return uuid.UUID(int=value)
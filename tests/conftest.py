@@ -1,25 +1,38 @@
 """
 Shared test fixtures for the Hotel Booking AI Agent.
 """
+import asyncio
 import pytest
 import os
 from pathlib import Path
 from datetime import datetime, timedelta
-from unittest.mock import patch
+from src.models.booking import Booking, Guest, RoomDetails
+
+try:
+    import uvloop
+except ImportError:  # Installed with uvicorn[standard], but not on every platform
+    uvloop = None
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Run async tests on uvloop when it is available."""
+    if uvloop is None:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
 
 # Mock environment variables
 @pytest.fixture(autouse=True)
-def mock_env_vars():
+def mock_env_vars(monkeypatch):
     """Mock environment variables for testing."""
-    with patch.dict('os.environ', {
+    for name, value in {
         'GROQ_API_KEY': 'test_groq_key',
         'INSTAGRAM_ACCESS_TOKEN': 'test_instagram_token',
         'INSTAGRAM_APP_ID': 'test_app_id',
         'INSTAGRAM_APP_SECRET': 'test_app_secret',
         'DEBUG': 'True',
         'LOG_LEVEL': 'INFO'
-    }):
-        yield
+    }.items():
+        monkeypatch.setenv(name, value)
 
 @pytest.fixture
 def test_data_dir(tmp_path):
@@ -56,6 +69,20 @@ def sample_booking_details():
         "num_children": 1
     }
 
+@pytest.fixture
+def make_booking():
+    """Create a factory for valid bookings."""
+    def make(name: str = "John Doe", email: str = "john@example.com") -> Booking:
+        now = datetime.now()
+        return Booking(
+            guest=Guest(name=name, email=email),
+            room=RoomDetails(room_type="standard", rate=100.0, num_adults=2, num_children=0),
+            check_in_date=now + timedelta(days=1),
+            check_out_date=now + timedelta(days=3),
+            total_amount=200.0
+        )
+    return make
+
 @pytest.fixture
 def sample_conversation_history():
     """Create sample conversation history for testing."""
@@ -1,15 +1,57 @@
 """
 Tests for the main application module.
 """
+import hmac
+import httpx
+import orjson
 import pytest
 from fastapi.testclient import TestClient
 from datetime import datetime, timedelta
-from unittest.mock import patch, MagicMock
 
 from src.app import app
 from src.config import HOTEL_CONFIG
+from src.instagram.client import InstagramClient
+from src.llm.openai_client import OpenAIClient
+
+class FakeRedis:
+    """Keeps values in a dict, standing in for the shared Redis."""
+    
+    def __init__(self, connection_pool=None):
+        self.data = {}
+    
+    async def get(self, key):
+        return self.data.get(key)
+    
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
 
-client = TestClient(app)
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Run the app lifespan with Redis, OpenAI and the Graph API stubbed out."""
+    async def unavailable(self, *args, **kwargs):
+        raise RuntimeError("OpenAI is not reachable from tests")
+    
+    async def post(self, url, payload, params):
+        return httpx.Response(200, request=httpx.Request("POST", url))
+    
+    monkeypatch.setattr("src.app.Redis", FakeRedis)
+    monkeypatch.setattr("src.app.RESERVATIONS_FILE", tmp_path / "bookings.json")
+    monkeypatch.setattr(OpenAIClient, "generate_response", unavailable)
+    monkeypatch.setattr(OpenAIClient, "embed", unavailable)
+    monkeypatch.setattr(InstagramClient, "_post", post)
+    with TestClient(app) as client:
+        yield client
+
+def post_webhook(client, data):
+    """Post a webhook payload signed with the app secret."""
+    payload = orjson.dumps(data)
+    app_secret = client.app.state.instagram_client.app_secret
+    signature = hmac.new(app_secret.encode("utf-8"), payload, "sha1").hexdigest()
+    return client.post(
+        "/webhook",
+        content=payload,
+        headers={"Content-Type": "application/json", "X-Hub-Signature": f"sha1={signature}"}
+    )
 
 @pytest.fixture
 def sample_booking():
@@ -26,19 +68,40 @@ def sample_booking():
         "guest_phone": "+1234567890"
     }
 
-def test_root():
+def test_root(client):
     """Test root endpoint."""
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Hotel Booking AI Agent is running"}
 
-def test_get_hotel_info():
+def test_get_hotel_info(client):
     """Test getting hotel information."""
     response = client.get("/hotel/info")
     assert response.status_code == 200
     assert response.json() == HOTEL_CONFIG
 
-def test_webhook_verification():
+@pytest.mark.parametrize("accept_encoding, gzipped", [
+    ("gzip", True),
+    ("gzip, deflate, br", True),
+    ("br;q=1.0, gzip;q=0.5", True),
+    ("*", True),
+    ("identity", False),
+    # q=0 explicitly refuses a coding
+    ("gzip;q=0", False),
+    ("gzip; q=0.0, deflate", False),
+    ("*;q=0", False),
+    ("*, gzip;q=0", False),
+])
+def test_get_hotel_info_encoding(client, accept_encoding, gzipped):
+    """Test that hotel info is only gzipped for clients that accept it."""
+    response = client.get("/hotel/info", headers={"Accept-Encoding": accept_encoding})
+    assert response.status_code == 200
+    assert response.json() == HOTEL_CONFIG
+    assert (response.headers.get("content-encoding") == "gzip") is gzipped
+    # Both variants tell caches the body depends on Accept-Encoding
+    assert "Accept-Encoding" in response.headers["vary"]
+
+def test_webhook_verification(client):
     """Test webhook verification endpoint."""
     params = {
         "mode": "subscribe",
@@ -48,49 +111,50 @@ def test_webhook_verification():
     response = client.get("/webhook", params=params)
     assert response.status_code in [200, 403]  # Depends on token validation
 
-def test_webhook_processing():
+def test_webhook_processing(client):
     """Test webhook processing endpoint."""
     webhook_data = {
         "entry": [{
             "messaging": [{
                 "sender": {"id": "user123"},
+                "recipient": {"id": "page456"},
                 "message": {"text": "Hello"}
             }]
         }]
     }
-    response = client.post("/webhook", json=webhook_data)
+    response = post_webhook(client, webhook_data)
     assert response.status_code == 200
 
-def test_create_reservation(sample_booking):
+def test_create_reservation(client, sample_booking):
     """Test creating a reservation."""
     response = client.post("/reservations", json=sample_booking)
     assert response.status_code == 200
     assert "booking_id" in response.json()
     assert response.json()["status"] == "confirmed"
 
-def test_get_reservation(sample_booking):
+def test_get_reservation(client, sample_booking):
     """Test getting a reservation."""
     # First create a reservation
     create_response = client.post("/reservations", json=sample_booking)
     booking_id = create_response.json()["booking_id"]
-
+    
     # Then get it
     response = client.get(f"/reservations/{booking_id}")
     assert response.status_code == 200
     assert response.json()["room_type"] == sample_booking["room_type"]
     assert response.json()["guest_name"] == sample_booking["guest_name"]
 
-def test_get_nonexistent_reservation():
+def test_get_nonexistent_reservation(client):
     """Test getting a non-existent reservation."""
     response = client.get("/reservations/nonexistent-id")
     assert response.status_code == 404
 
-def test_update_reservation(sample_booking):
+def test_update_reservation(client, sample_booking):
     """Test updating a reservation."""
     # First create a reservation
     create_response = client.post("/reservations", json=sample_booking)
     booking_id = create_response.json()["booking_id"]
-
+    
     # Then update it
     updates = {
         "num_adults": 3,
@@ -99,44 +163,70 @@ def test_update_reservation(sample_booking):
     response = client.put(f"/reservations/{booking_id}", json=updates)
     assert response.status_code == 200
     assert response.json()["status"] == "updated"
-
+    
     # Verify the update
     get_response = client.get(f"/reservations/{booking_id}")
     assert get_response.json()["num_adults"] == 3
     assert get_response.json()["num_children"] == 2
 
-def test_delete_reservation(sample_booking):
+def test_delete_reservation(client, sample_booking):
     """Test deleting a reservation."""
     # First create a reservation
     create_response = client.post("/reservations", json=sample_booking)
     booking_id = create_response.json()["booking_id"]
-
+    
     # Then delete it
     response = client.delete(f"/reservations/{booking_id}")
     assert response.status_code == 200
     assert response.json()["status"] == "deleted"
-
+    
     # Verify deletion
     get_response = client.get(f"/reservations/{booking_id}")
     assert get_response.status_code == 404
 
+def test_update_booking_ignores_null_fields(client):
+    """Test that null fields in a booking update keep their current values."""
+    now = datetime.now()
+    booking = client.post("/bookings", json={
+        "guest": {"name": "John Doe", "email": "john@example.com"},
+        "room": {"room_type": "standard", "rate": 100.0, "num_adults": 2, "num_children": 0},
+        "check_in_date": (now + timedelta(days=1)).isoformat(),
+        "check_out_date": (now + timedelta(days=3)).isoformat()
+    }).json()
+    
+    response = client.put(f"/bookings/{booking['id']}", json={
+        "guest": None,
+        "check_in_date": None,
+        "room": {"room_type": "suite", "rate": 200.0, "num_adults": 2, "num_children": 0}
+    })
+    assert response.status_code == 200
+    assert response.json()["guest"] == booking["guest"]
+    assert response.json()["check_in_date"] == booking["check_in_date"]
+    assert response.json()["room"]["room_type"] == "suite"
+
 @pytest.mark.asyncio
-async def test_webhook_with_conversation():
+async def test_webhook_with_conversation(client, monkeypatch):
     """Test webhook with conversation flow."""
-    with patch('src.instagram_client.InstagramClient.send_message') as mock_send:
-        mock_send.return_value = True
-        
-        # Simulate booking request
-        webhook_data = {
-            "entry": [{
-                "messaging": [{
-                    "sender": {"id": "user123"},
-                    "message": {"text": "I want to book a room"}
-                }]
+    sent = []
+    
+    async def send_message(self, user_id, message):
+        sent.append((user_id, message))
+        return True
+    
+    monkeypatch.setattr(InstagramClient, "send_message", send_message)
+    
+    # Simulate booking request
+    webhook_data = {
+        "entry": [{
+            "messaging": [{
+                "sender": {"id": "user123"},
+                "recipient": {"id": "page456"},
+                "message": {"text": "I want to book a room"}
             }]
-        }
-        response = client.post("/webhook", json=webhook_data)
-        assert response.status_code == 200
-        
-        # Verify bot responded
-        mock_send.assert_called() 
\ No newline at end of file
+        }]
+    }
+    response = post_webhook(client, webhook_data)
+    assert response.status_code == 200
+    
+    # Verify bot responded
+    assert sent 
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Tests for the booking service.
+"""
+import asyncio
+import pytest
+from src.config import HOTEL_CONFIG
+from src.llm.base import BaseLLMClient, LLMResponse
+from src.models.booking import Booking
+from src.services.booking import BookingService
+from src.storage.json_storage import JSONStorage
+
+class FakeLLMClient(BaseLLMClient):
+    """Streams a canned reply and records the messages it was sent."""
+    
+    def __init__(self):
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+    
+    async def generate_response(self, messages, temperature=None, max_tokens=None, **kwargs):
+        self.calls.append(messages)
+        return LLMResponse(content="Confirmed")
+    
+    async def stream_response(self, messages, temperature=None, max_tokens=None, **kwargs):
+        self.calls.append(messages)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            # Echo the prompt back in two chunks so callers have to join them;
+            # later calls finish first to shuffle completion order
+            prompt = messages[-1].content
+            yield prompt[:10]
+            for _ in range(10 - len(self.calls) % 10):
+                await asyncio.sleep(0)
+            yield prompt[10:]
+        finally:
+            self.active -= 1
+    
+    async def generate_structured_response(self, messages, response_model, temperature=None, max_tokens=None, **kwargs):
+        raise NotImplementedError
+    
+    async def embed(self, texts):
+        raise NotImplementedError
+
+@pytest.fixture
+def llm_client():
+    """Create a fake LLM client."""
+    return FakeLLMClient()
+
+@pytest.fixture
+def booking_service(tmp_path, llm_client):
+    """Create a booking service backed by temporary storage."""
+    return BookingService(JSONStorage(tmp_path / "bookings.json", Booking), llm_client)
+
+@pytest.mark.asyncio
+async def test_confirmation_message_uses_agent_prompt(booking_service, llm_client, make_booking):
+    """Test that confirmation messages are generated under the agent system prompt."""
+    booking = make_booking()
+    message = await booking_service.generate_confirmation_message(booking)
+    
+    [[system, user]] = llm_client.calls
+    assert message == user.content
+    assert system.role == "system"
+    assert system.content == booking_service.agent_prompt
+    assert HOTEL_CONFIG["name"] in system.content
+    assert "{" not in system.content
+    assert user.role == "user"
+    assert str(booking.id) in user.content
+
+@pytest.mark.asyncio
+async def test_generate_confirmation_messages(booking_service, llm_client, make_booking):
+    """Test generating many confirmations concurrently, in input order."""
+    bookings = [make_booking(f"Guest {i}") for i in range(10)]
+    messages = await booking_service.generate_confirmation_messages(bookings, concurrency=3)
+    
+    assert len(messages) == len(bookings)
+    for booking, message in zip(bookings, messages):
+        assert f"Booking ID: {booking.id}" in message
+        assert f"Guest: {booking.guest.name}" in message
+    # Calls overlap, but never beyond the bound
+    assert llm_client.max_active == 3
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("field", ["guest", "room", "check_in_date", "check_out_date"])
+async def test_validate_rejects_null_fields(booking_service, field, make_booking):
+    """Test that a null required field is a validation error, not a crash."""
+    data = {**make_booking().model_dump(), field: None}
+    with pytest.raises(ValueError):
+        await booking_service.validate(data)
@@ -2,7 +2,7 @@
 Tests for the data storage module.
 """
 import pytest
-import json
+import orjson
 from datetime import datetime, timedelta
 from pathlib import Path
 from src.data_storage import ReservationStorage
@@ -31,7 +31,7 @@ def sample_booking():
 def test_storage_initialization(temp_storage):
     """Test storage initialization."""
     assert temp_storage.reservations_file.exists()
-    data = json.loads(temp_storage.reservations_file.read_text())
+    data = orjson.loads(temp_storage.reservations_file.read_bytes())
     assert "reservations" in data
     assert isinstance(data["reservations"], list)
     assert "last_updated" in data
@@ -112,4 +112,43 @@ def test_check_availability(temp_storage, sample_booking):
         now + timedelta(days=12),
         "standard"
     )
-    assert is_available 
\ No newline at end of file
+    assert is_available
+
+def test_returned_reservations_are_copies(temp_storage, sample_booking):
+    """Test that changing a returned reservation doesn't change the stored one."""
+    booking_id = temp_storage.create_reservation(sample_booking)
+    temp_storage.get_reservation(booking_id)["room_type"] = "suite"
+    for reservation in temp_storage.get_all_reservations():
+        reservation["room_type"] = "suite"
+    
+    assert temp_storage.get_reservation(booking_id)["room_type"] == "standard"
+    assert not temp_storage.check_availability(
+        datetime.fromisoformat(sample_booking["check_in_date"]),
+        datetime.fromisoformat(sample_booking["check_out_date"]),
+        "standard"
+    )
+    
+    # The update is logged with the stored room type, not the mutated copy
+    temp_storage.update_reservation(booking_id, {"num_adults": 3})
+    reloaded = ReservationStorage(temp_storage.reservations_file)
+    assert reloaded.get_reservation(booking_id)["room_type"] == "standard"
+
+def test_reload_after_external_write(temp_storage, sample_booking):
+    """Test that changes written by another process are picked up."""
+    booking_id = temp_storage.create_reservation(sample_booking)
+    
+    other = ReservationStorage(temp_storage.reservations_file)
+    other.delete_reservation(booking_id)
+    
+    assert temp_storage.get_reservation(booking_id) is None
+    assert temp_storage.get_all_reservations() == []
+
+def test_compaction_folds_log_into_snapshot(tmp_path, sample_booking):
+    """Test that compaction writes the log back into the snapshot file."""
+    storage = ReservationStorage(tmp_path / "test_reservations.json", compact_threshold=0)
+    booking_id = storage.create_reservation(sample_booking)
+    
+    assert not storage.log_file.exists()
+    data = orjson.loads(storage.reservations_file.read_bytes())
+    assert [r["booking_id"] for r in data["reservations"]] == [booking_id]
+    assert ReservationStorage(storage.reservations_file).get_reservation(booking_id) is not None
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Tests for the date parsing utility.
+"""
+import pytest
+from datetime import date, datetime
+from src.utils.date_parser import DateParser
+
+# Fixed clock so relative dates are deterministic
+NOW = datetime(2025, 3, 1, 12, 0)
+
+@pytest.mark.parametrize("text, expected", [
+    # ISO
+    ("From 2025-03-10 to 2025-03-12", (date(2025, 3, 10), date(2025, 3, 12))),
+    # Numeric dates are read month first, like dateutil does
+    ("03/10/2025 to 03/12/2025", (date(2025, 3, 10), date(2025, 3, 12))),
+    ("03-10-2025 - 03-12-2025", (date(2025, 3, 10), date(2025, 3, 12))),
+    # ...unless the first number can only be a day
+    ("25/03/2025 to 27/03/2025", (date(2025, 3, 25), date(2025, 3, 27))),
+    # Month names
+    ("March 10, 2025 to March 12, 2025", (date(2025, 3, 10), date(2025, 3, 12))),
+    ("10 March 2025 and 12 March 2025", (date(2025, 3, 10), date(2025, 3, 12))),
+    # Relative to NOW
+    ("Tomorrow for a night, leaving next week", (date(2025, 3, 2), date(2025, 3, 8))),
+    ("3 days from now until 2 weeks from today", (date(2025, 3, 4), date(2025, 3, 15))),
+    # Dates are sorted, whatever order they are given in
+    ("Leaving 2025-03-12, arriving 2025-03-10", (date(2025, 3, 10), date(2025, 3, 12))),
+])
+def test_extract_dates(text, expected):
+    """Test extracting check-in and check-out dates."""
+    dates = DateParser.extract_dates(text, now=NOW)
+    assert (dates["check_in"], dates["check_out"]) == expected
+
+@pytest.mark.parametrize("text", [
+    "I'd like to book a room",
+    # A single ISO date is not also read as a second "25-03-10" date
+    "Arriving 2025-03-10",
+    "next month",
+    # Invalid dates are skipped
+    "tomorrow and 2025-02-30",
+])
+def test_extract_dates_needs_two_dates(text):
+    """Test that fewer than two usable dates yield None."""
+    assert DateParser.extract_dates(text, now=NOW) is None
+
+def test_extract_dates_cache_follows_the_day():
+    """Test that memoized relative dates are not reused across midnight."""
+    text = "tomorrow until next week"
+    before = DateParser.extract_dates(text, now=datetime(2025, 3, 1, 23, 59))
+    after = DateParser.extract_dates(text, now=datetime(2025, 3, 2, 0, 1))
+    assert before == {"check_in": date(2025, 3, 2), "check_out": date(2025, 3, 8)}
+    assert after == {"check_in": date(2025, 3, 3), "check_out": date(2025, 3, 9)}
+
+def test_extract_dates_returns_a_copy():
+    """Test that callers can't modify the memoized result."""
+    dates = DateParser.extract_dates("tomorrow until next week", now=NOW)
+    dates["check_in"] = None
+    assert DateParser.extract_dates("tomorrow until next week", now=NOW)["check_in"] == date(2025, 3, 2)
+
+@pytest.mark.parametrize("check_in, check_out, expected", [
+    (date(2025, 3, 2), date(2025, 3, 5), (True, "")),
+    (date(2025, 2, 28), date(2025, 3, 5), (False, "Check-in date cannot be in the past")),
+    (date(2025, 3, 5), date(2025, 3, 5), (False, "Check-out date must be after check-in date")),
+    (date(2025, 3, 2), date(2025, 4, 2), (False, "Maximum stay duration is 30 days")),
+    (date(2026, 3, 5), date(2026, 3, 6), (False, "Bookings can only be made up to 1 year in advance")),
+])
+def test_is_valid_date_range(check_in, check_out, expected):
+    """Test date range validation against a fixed day."""
+    assert DateParser.is_valid_date_range(check_in, check_out, now=NOW) == expected
@@ -0,0 +1,50 @@
+"""
+Tests for the identifier utilities.
+"""
+import time
+import uuid
+import pytest
+from src.utils import ids
+from src.utils.ids import uuid7
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the clock with one that only moves when told to."""
+    now = {"ms": 1_700_000_000_000}
+    monkeypatch.setattr(time, "time_ns", lambda: now["ms"] * 1_000_000)
+    # Forget the real clock's last timestamp
+    monkeypatch.setattr(ids, "_last_ms", 0)
+    return now
+
+def test_uuid7_version_and_variant():
+    """Test the version and variant bits."""
+    value = uuid7()
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+def test_uuid7_embeds_timestamp(clock):
+    """Test that the leading 48 bits are the Unix time in milliseconds."""
+    assert uuid7().int >> 80 == clock["ms"]
+
+def test_uuid7_sorts_across_milliseconds(clock):
+    """Test ordering of IDs created in distinct milliseconds."""
+    values = []
+    for _ in range(5):
+        values.append(uuid7())
+        clock["ms"] += 1
+    assert sorted(values) == values
+    assert sorted(map(str, values)) == list(map(str, values))
+
+def test_uuid7_sorts_within_a_millisecond(clock):
+    """Test ordering of IDs created in the same millisecond."""
+    values = [uuid7() for _ in range(5000)]
+    # More IDs than the counter holds, so some borrow the next millisecond
+    assert values[-1].int >> 80 > clock["ms"]
+    assert sorted(values) == values
+    assert len(set(values)) == len(values)
+
+def test_uuid7_monotonic_when_clock_goes_back(clock):
+    """Test that IDs keep increasing if the clock steps backwards."""
+    first = uuid7()
+    clock["ms"] -= 1000
+    assert uuid7() > first
@@ -1,27 +1,61 @@
 """
 Tests for the Instagram client module.
 """
+import asyncio
+from types import MappingProxyType
+import httpx
+import orjson
 import pytest
-from unittest.mock import patch, MagicMock
-from src.instagram_client import InstagramClient
-
-@pytest.fixture
-def instagram_client():
-    """Create an Instagram client instance for testing."""
-    with patch.dict('os.environ', {
-        'INSTAGRAM_ACCESS_TOKEN': 'test_token',
-        'INSTAGRAM_APP_ID': 'test_app_id',
-        'INSTAGRAM_APP_SECRET': 'test_secret'
-    }):
-        return InstagramClient()
-
-@pytest.fixture
-def mock_response():
-    """Create a mock response object."""
-    mock = MagicMock()
-    mock.json.return_value = {"data": [{"id": "123", "text": "Hello"}]}
-    mock.raise_for_status.return_value = None
-    return mock
+from src.instagram_client import InstagramClient, _load_credentials
+
+# Shared read-only payloads
+VALID_WEBHOOK = MappingProxyType({
+    "entry": [{
+        "messaging": [{
+            "sender": {"id": "user123"},
+            "message": {"text": "Hello"}
+        }]
+    }]
+})
+INVALID_WEBHOOK = MappingProxyType({"entry": [{}]})
+
+class FakeInstagramAPI:
+    """Answers requests with canned data, or raises the configured error."""
+    
+    def __init__(self):
+        self.error = None
+        self.batch_response = None
+        self.requests = []
+    
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.error is not None:
+            raise self.error
+        if request.method == "POST" and request.url.path == "/v12.0/":
+            # Graph API batch call: one sub-response per batched request
+            batch = orjson.loads(request.content)["batch"]
+            if self.batch_response is not None:
+                return httpx.Response(200, json=self.batch_response)
+            return httpx.Response(200, json=[{"code": 200, "body": "{}"} for _ in batch])
+        return httpx.Response(200, json={"data": [{"id": "123", "text": "Hello"}]})
+
+@pytest.fixture(scope="module")
+def instagram_api():
+    """Create the fake API behind the shared client."""
+    return FakeInstagramAPI()
+
+@pytest.fixture(scope="module")
+def instagram_client(instagram_api):
+    """Create one Instagram client instance shared by the tests in this module."""
+    # The monkeypatch fixture is function-scoped, so use a context of our own
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('INSTAGRAM_ACCESS_TOKEN', 'test_token')
+        mp.setenv('INSTAGRAM_APP_ID', 'test_app_id')
+        mp.setenv('INSTAGRAM_APP_SECRET', 'test_secret')
+        # Credentials are cached per process; reload them from the patched env
+        _load_credentials.cache_clear()
+        yield InstagramClient(client=httpx.AsyncClient(transport=httpx.MockTransport(instagram_api)))
+    _load_credentials.cache_clear()
 
 def test_client_initialization(instagram_client):
     """Test client initialization."""
@@ -29,70 +63,153 @@ def test_client_initialization(instagram_client):
     assert instagram_client.app_id == 'test_app_id'
     assert instagram_client.app_secret == 'test_secret'
 
-@pytest.mark.asyncio
-async def test_send_message(instagram_client, mock_response):
+@pytest.mark.asyncio(scope="module")
+async def test_send_message(instagram_client):
     """Test sending a message."""
-    with patch('requests.post', return_value=mock_response):
-        success = await instagram_client.send_message("user123", "Hello!")
-        assert success
+    success = await instagram_client.send_message("user123", "Hello!")
+    assert success
+
+@pytest.mark.asyncio(scope="module")
+async def test_send_batch(instagram_client, instagram_api, monkeypatch):
+    """Test sending several messages in one batch request."""
+    monkeypatch.setattr(instagram_api, "requests", [])
+    items = [("user1", "Hello"), ("user2", "Hi"), ("user3", "Hey")]
+    
+    results = await instagram_client.send_batch(items)
+    assert results == [True, True, True]
+    
+    assert len(instagram_api.requests) == 1
+    batch = orjson.loads(instagram_api.requests[0].content)["batch"]
+    assert [request["relative_url"] for request in batch] == ["me/messages"] * 3
+    assert [request["method"] for request in batch] == ["POST"] * 3
 
-@pytest.mark.asyncio
-async def test_get_messages(instagram_client, mock_response):
+@pytest.mark.asyncio(scope="module")
+@pytest.mark.parametrize("batch_response, expected", [
+    # An error object for the whole call instead of a list
+    ({"error": {"message": "Invalid OAuth access token", "code": 190}}, [False, False]),
+    # Fewer sub-responses than requests can't be matched up
+    ([{"code": 200, "body": "{}"}], [False, False]),
+    # Per-message failures and timeouts
+    ([{"code": 400, "body": "{}"}, None], [False, False]),
+    ([{"code": 200, "body": "{}"}, "unexpected"], [True, False]),
+])
+async def test_send_batch_bad_response(instagram_client, instagram_api, monkeypatch, batch_response, expected):
+    """Test sending a batch whose response doesn't report every message as sent."""
+    monkeypatch.setattr(instagram_api, "batch_response", batch_response)
+    results = await instagram_client.send_batch([("user1", "Hello"), ("user2", "Hi")])
+    assert results == expected
+
+@pytest.mark.asyncio(scope="module")
+async def test_send_many_concurrent(instagram_client, monkeypatch):
+    """Test that send_many overlaps sends up to the concurrency limit."""
+    active = 0
+    max_active = 0
+    
+    async def send_message(user_id, message):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0)
+        active -= 1
+        return user_id != "user3"
+    
+    monkeypatch.setattr(instagram_client, "send_message", send_message)
+    monkeypatch.setattr(instagram_client, "max_concurrency", 2)
+    
+    results = await instagram_client.send_many([(f"user{i}", "Hello") for i in range(5)])
+    assert results == [True, True, True, False, True]
+    assert max_active == 2
+
+@pytest.mark.asyncio(scope="module")
+async def test_get_messages(instagram_client):
     """Test getting messages."""
-    with patch('requests.get', return_value=mock_response):
-        messages = await instagram_client.get_messages("user123")
-        assert len(messages) == 1
-        assert messages[0]["id"] == "123"
+    messages = await instagram_client.get_messages("user123")
+    assert len(messages) == 1
+    assert messages[0]["id"] == "123"
 
-def test_verify_webhook(instagram_client):
+@pytest.mark.parametrize("mode, token, expected", [
+    ("subscribe", "test_secret", "1234567890"),
+    # Invalid verification
+    ("invalid", "wrong_token", None),
+    ("invalid", "test_secret", None),
+    ("subscribe", "test_secreX", None),
+    # Tokens of a different length than the secret
+    ("subscribe", "test", None),
+    ("subscribe", "test_secret_but_longer", None),
+    ("subscribe", "", None),
+    ("subscribe", None, None),
+])
+def test_verify_webhook(instagram_client, mode, token, expected):
     """Test webhook verification."""
-    challenge = "1234567890"
-    result = instagram_client.verify_webhook(
-        mode="subscribe",
-        token="test_secret",
-        challenge=challenge
-    )
-    assert result == challenge
-
-    # Test invalid verification
     result = instagram_client.verify_webhook(
-        mode="invalid",
-        token="wrong_token",
-        challenge=challenge
+        mode=mode,
+        token=token,
+        challenge="1234567890"
     )
-    assert result is None
+    assert result == expected
 
 def test_process_webhook(instagram_client):
     """Test webhook data processing."""
-    # Valid webhook data
-    webhook_data = {
-        "entry": [{
-            "messaging": [{
-                "sender": {"id": "user123"},
-                "message": {"text": "Hello"}
-            }]
-        }]
-    }
-    result = instagram_client.process_webhook(webhook_data)
+    result = instagram_client.process_webhook(VALID_WEBHOOK)
     assert result is not None
     assert result["sender_id"] == "user123"
     assert result["message"] == "Hello"
 
-    # Invalid webhook data
-    invalid_data = {"entry": [{}]}
-    result = instagram_client.process_webhook(invalid_data)
+def test_process_webhook_bytes(instagram_client):
+    """Test processing a raw webhook body."""
+    result = instagram_client.process_webhook_bytes(orjson.dumps(dict(VALID_WEBHOOK)))
+    assert result is not None
+    assert result["sender_id"] == "user123"
+    assert result["message"] == "Hello"
+    
+    assert instagram_client.process_webhook_bytes(b"not json") is None
+
+@pytest.mark.parametrize("webhook_data", [
+    INVALID_WEBHOOK,
+    {},
+    {"entry": []},
+    # Not a text message
+    {"entry": [{"messaging": [{"sender": {"id": "user123"}, "read": {"mid": "m1"}}]}]},
+    {"entry": [{"messaging": [{"sender": {"id": "user123"}, "message": {"text": ""}}]}]},
+    {"entry": [{"messaging": [{"message": {"text": "Hello"}}]}]},
+])
+def test_process_webhook_invalid(instagram_client, webhook_data):
+    """Test processing webhook data without a usable text message."""
+    result = instagram_client.process_webhook(webhook_data)
     assert result is None
 
-@pytest.mark.asyncio
-async def test_send_message_failure(instagram_client):
+def _with_message(**message):
+    """Build an otherwise valid text message event."""
+    message = {"text": "Hello", **message}
+    return {"entry": [{"messaging": [{"sender": {"id": "user123"}, "message": message}]}]}
+
+def _nested(depth):
+    data = {}
+    for _ in range(depth):
+        data = {"nested": [data]}
+    return data
+
+@pytest.mark.parametrize("webhook_data", [
+    # Each would be accepted as a text message without the limits
+    _with_message(extra=_nested(100)),
+    _with_message(text="x" * 10000),
+    _with_message(extra=list(range(1000))),
+])
+def test_process_webhook_rejects_oversized(instagram_client, webhook_data):
+    """Test rejecting deeply nested or oversized webhook payloads."""
+    assert instagram_client.process_webhook(webhook_data) is None
+    assert instagram_client.process_webhook_bytes(orjson.dumps(webhook_data)) is None
+
+@pytest.mark.asyncio(scope="module")
+async def test_send_message_failure(instagram_client, instagram_api, monkeypatch):
     """Test sending a message with API failure."""
-    with patch('requests.post', side_effect=Exception("API Error")):
-        success = await instagram_client.send_message("user123", "Hello!")
-        assert not success
+    monkeypatch.setattr(instagram_api, "error", httpx.ConnectError("API Error"))
+    success = await instagram_client.send_message("user123", "Hello!")
+    assert not success
 
-@pytest.mark.asyncio
-async def test_get_messages_failure(instagram_client):
+@pytest.mark.asyncio(scope="module")
+async def test_get_messages_failure(instagram_client, instagram_api, monkeypatch):
     """Test getting messages with API failure."""
-    with patch('requests.get', side_effect=Exception("API Error")):
-        messages = await instagram_client.get_messages("user123")
-        assert len(messages) == 0 
\ No newline at end of file
+    monkeypatch.setattr(instagram_api, "error", httpx.ConnectError("API Error"))
+    messages = await instagram_client.get_messages("user123")
+    assert len(messages) == 0 
\ No newline at end of file
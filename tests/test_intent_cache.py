@@ -0,0 +1,71 @@
+"""
+Tests for the intent classification cache.
+"""
+import pytest
+from src.conversation.intent_cache import IntentCache
+
+class FakeRedis:
+    """Keeps values in a dict and counts reads, like a Redis that never expires."""
+    
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.reads = 0
+    
+    async def get(self, key):
+        self.reads += 1
+        return self.data.get(key)
+    
+    async def setex(self, key, ttl, value):
+        self.data[key] = value.encode("utf-8")
+        self.ttls[key] = ttl
+
+@pytest.mark.parametrize("message, expected", [
+    ("Please CANCEL my booking", "cancellation"),
+    ("Can I reschedule?", "rescheduling"),
+    # Whole words only
+    ("What is your cancellation policy?", None),
+    ("I'd like to book a room", None),
+])
+def test_keyword_intent(message, expected):
+    """Test detecting intents from unambiguous keywords."""
+    assert IntentCache.keyword_intent(message) == expected
+
+@pytest.mark.asyncio
+async def test_local_cache():
+    """Test caching intents in process by normalized message."""
+    cache = IntentCache(maxsize=2)
+    assert await cache.get("Book a room") is None
+    
+    await cache.set("Book a room", "booking")
+    assert await cache.get("  book a ROOM ") == "booking"
+
+@pytest.mark.asyncio
+async def test_local_cache_evicts_least_recently_used():
+    """Test that the local tier is bounded."""
+    cache = IntentCache(maxsize=2)
+    await cache.set("book a room", "booking")
+    await cache.set("what time is check-in", "inquiry")
+    await cache.get("book a room")
+    await cache.set("confirm my booking", "confirmation")
+    
+    assert await cache.get("book a room") == "booking"
+    assert await cache.get("what time is check-in") is None
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared():
+    """Test that intents cached by one worker are found by another."""
+    redis = FakeRedis()
+    writer = IntentCache(maxsize=2, redis=redis, ttl=60)
+    await writer.set("Book a room", "booking")
+    [key] = redis.data
+    assert key.startswith("intent:")
+    assert redis.ttls[key] == 60
+    
+    reader = IntentCache(maxsize=2, redis=redis)
+    assert await reader.get("book a room") == "booking"
+    # The Redis hit is copied into the local tier
+    assert await reader.get("book a room") == "booking"
+    assert redis.reads == 1
+    
+    assert await reader.get("something else") is None
@@ -0,0 +1,190 @@
+"""
+Tests for the JSON file storage.
+"""
+import asyncio
+import orjson
+import pytest
+from src.models.booking import Booking
+from src.storage.json_storage import JSONStorage
+
+@pytest.fixture
+def storage_path(tmp_path):
+    """Path of the base file for a fresh storage."""
+    return tmp_path / "bookings.json"
+
+@pytest.mark.asyncio
+async def test_compaction_keeps_other_writers_entries(storage_path, make_booking):
+    """Test that a compaction never drops entries logged by another instance."""
+    # Stand-ins for two server workers sharing the same files
+    first = JSONStorage(storage_path, Booking, compact_every=1, flush_interval=0.05)
+    second = JSONStorage(storage_path, Booking)
+    mine, theirs = make_booking(), make_booking(email="jane@example.com")
+    
+    # first queues its write, then second logs while first's flusher waits
+    pending = asyncio.create_task(first.create(mine))
+    await asyncio.sleep(0)
+    await second.create(theirs)
+    await pending
+    
+    # first saw second's entry in the log, so it must reload, not compact
+    assert await first.exists(theirs.id)
+    await first.aclose()
+    await second.aclose()
+    
+    reloaded = JSONStorage(storage_path, Booking)
+    assert await reloaded.exists(mine.id)
+    assert await reloaded.exists(theirs.id)
+
+@pytest.mark.asyncio
+async def test_writes_survive_reload_through_log(storage_path, make_booking):
+    """Test that create, update and delete are replayed from the log."""
+    storage = JSONStorage(storage_path, Booking)
+    kept, removed = make_booking(), make_booking(email="jane@example.com")
+    await storage.create(kept)
+    await storage.create(removed)
+    kept.room.num_adults = 3
+    await storage.update(kept.id, kept)
+    await storage.delete(removed.id)
+    
+    # Nothing compacted yet, so a fresh instance has to replay the log
+    assert storage.wal_path.exists()
+    reloaded = JSONStorage(storage_path, Booking)
+    booking = await reloaded.get(kept.id)
+    assert booking.room.num_adults == 3
+    assert booking.guest == kept.guest
+    assert await reloaded.get(removed.id) is None
+    await storage.aclose()
+
+@pytest.mark.asyncio
+async def test_refresh_replays_only_new_log_entries(storage_path, monkeypatch, make_booking):
+    """Test that another writer's appends are picked up without a full reload."""
+    reader = JSONStorage(storage_path, Booking)
+    writer = JSONStorage(storage_path, Booking)
+    kept, removed = make_booking(), make_booking(email="jane@example.com")
+    await writer.create_many([kept, removed])
+    assert len(await reader.list()) == 2
+    
+    def fail():
+        raise AssertionError("base file reloaded")
+    
+    monkeypatch.setattr(reader, "_load", fail)
+    await writer.delete(removed.id)
+    assert await reader.exists(kept.id)
+    assert not await reader.exists(removed.id)
+    await reader.aclose()
+    await writer.aclose()
+
+@pytest.mark.asyncio
+async def test_compaction_at_compact_every(storage_path, make_booking):
+    """Test that the log is folded into the base file every compact_every writes."""
+    storage = JSONStorage(storage_path, Booking, compact_every=2)
+    first, second = make_booking(), make_booking(email="jane@example.com")
+    await storage.create(first)
+    assert storage.wal_path.exists()
+    
+    await storage.create(second)
+    assert not storage.wal_path.exists()
+    rows = orjson.loads(storage_path.read_bytes())
+    assert {row["id"] for row in rows} == {str(first.id), str(second.id)}
+    await storage.aclose()
+
+@pytest.mark.asyncio
+async def test_reload_skips_torn_last_log_line(storage_path, make_booking):
+    """Test recovering from a crash in the middle of a log append."""
+    storage = JSONStorage(storage_path, Booking)
+    booking = make_booking()
+    await storage.create(booking)
+    with storage.wal_path.open("ab") as wal:
+        wal.write(b'{"op": "put", "id": "')
+    
+    reloaded = JSONStorage(storage_path, Booking)
+    assert await reloaded.exists(booking.id)
+    assert len(await reloaded.list()) == 1
+    await storage.aclose()
+
+@pytest.mark.asyncio
+async def test_write_failure_surfaces_to_caller(storage_path, monkeypatch, make_booking):
+    """Test that a failed log write fails the call instead of being swallowed."""
+    storage = JSONStorage(storage_path, Booking)
+    
+    def fail(entries):
+        raise OSError("disk full")
+    
+    monkeypatch.setattr(storage, "_append_wal", fail)
+    booking = make_booking()
+    with pytest.raises(OSError, match="disk full"):
+        await storage.create(booking)
+    
+    # The index is reloaded from disk rather than serving the unlogged write
+    assert not await storage.exists(booking.id)
+    await storage.aclose()
+
+@pytest.mark.asyncio
+async def test_write_after_close_raises(storage_path, make_booking):
+    """Test that writing to a closed storage fails instead of waiting forever."""
+    storage = JSONStorage(storage_path, Booking)
+    booking = make_booking()
+    await storage.create(booking)
+    await storage.aclose()
+    
+    with pytest.raises(RuntimeError, match="closed"):
+        await asyncio.wait_for(storage.create(make_booking(email="jane@example.com")), timeout=1)
+    assert await storage.exists(booking.id)
+
+def record_batches(storage, monkeypatch):
+    """Record the entries of every log append made by a storage."""
+    batches = []
+    append_wal = storage._append_wal
+    
+    def record(entries):
+        batches.append(entries)
+        append_wal(entries)
+    
+    monkeypatch.setattr(storage, "_append_wal", record)
+    return batches
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_one_log_append(storage_path, monkeypatch, make_booking):
+    """Test that writes queued together are group-committed in one append."""
+    storage = JSONStorage(storage_path, Booking)
+    batches = record_batches(storage, monkeypatch)
+    bookings = [make_booking(email=f"guest{i}@example.com") for i in range(5)]
+    
+    await asyncio.gather(*(storage.create(booking) for booking in bookings))
+    assert [len(batch) for batch in batches] == [5]
+    
+    # And every one of them is durable
+    reloaded = JSONStorage(storage_path, Booking)
+    assert len(await reloaded.list()) == 5
+    await storage.aclose()
+
+@pytest.mark.asyncio
+async def test_create_many(storage_path, monkeypatch, make_booking):
+    """Test creating several items in one log append."""
+    storage = JSONStorage(storage_path, Booking)
+    batches = record_batches(storage, monkeypatch)
+    bookings = [make_booking(email=f"guest{i}@example.com") for i in range(3)]
+    
+    assert await storage.create_many(bookings) == bookings
+    assert [len(batch) for batch in batches] == [3]
+    reloaded = JSONStorage(storage_path, Booking)
+    assert {booking.id for booking in await reloaded.list()} == {booking.id for booking in bookings}
+    await storage.aclose()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filters, expected", [
+    ({"guest.email": "jane@example.com"}, ["jane@example.com"]),
+    ({"guest.email": "nobody@example.com"}, []),
+    ({"total_amount": 200.0}, ["jane@example.com", "john@example.com"]),
+    # A path through a field that isn't a nested model never matches
+    ({"total_amount.value": 200.0}, []),
+])
+async def test_list_filters(storage_path, filters, expected, make_booking):
+    """Test filtering on top-level and dotted nested fields."""
+    storage = JSONStorage(storage_path, Booking)
+    await storage.create_many([make_booking(), make_booking(email="jane@example.com")])
+    
+    bookings = await storage.list(filters)
+    assert sorted(booking.guest.email for booking in bookings) == expected
+    assert sorted([booking.guest.email async for booking in storage.iter(filters)]) == expected
+    await storage.aclose()
@@ -0,0 +1,102 @@
+"""
+Tests for the hotel knowledge base.
+"""
+import pytest
+from src.conversation.knowledge_base import KnowledgeBase, build_chunks
+
+CHUNKS = [
+    "The pool is open from 7am to 9pm.",
+    "The gym is on the second floor.",
+    "Pets are not allowed.",
+]
+
+# Each word pulls its vector towards one chunk
+WORD_VECTORS = {
+    "pool": [1.0, 0.0, 0.0],
+    "swim": [0.9, 0.1, 0.0],
+    "gym": [0.1, 1.0, 0.0],
+    "pets": [0.0, 0.0, 1.0],
+    "dog": [0.1, 0.0, 0.9],
+}
+
+class FakeEmbeddings:
+    """Embeds text by summing the vectors of the known words in it."""
+    
+    def __init__(self):
+        self.calls = []
+        self.error = None
+    
+    async def embed(self, texts):
+        self.calls.append(texts)
+        if self.error is not None:
+            raise self.error
+        vectors = []
+        for text in texts:
+            vector = [0.0, 0.0, 0.0]
+            for word in text.lower().split():
+                for i, value in enumerate(WORD_VECTORS.get(word.strip(".?"), [0.0, 0.0, 0.0])):
+                    vector[i] += value
+            vectors.append(vector)
+        return vectors
+
+@pytest.fixture
+def embeddings():
+    """Create a fake embeddings client."""
+    return FakeEmbeddings()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query, expected", [
+    ("Can I swim in the pool?", [CHUNKS[0], CHUNKS[1]]),
+    ("Where is the gym", [CHUNKS[1], CHUNKS[0]]),
+    ("Can I bring my dog", [CHUNKS[2], CHUNKS[0]]),
+])
+async def test_search_returns_top_k(embeddings, query, expected):
+    """Test that the most similar chunks come back, best first."""
+    knowledge_base = KnowledgeBase(embeddings, CHUNKS, top_k=2)
+    await knowledge_base.load()
+    assert await knowledge_base.search(query) == expected
+
+@pytest.mark.asyncio
+async def test_search_caches_query_embeddings(embeddings):
+    """Test that a repeated normalized query is embedded once."""
+    knowledge_base = KnowledgeBase(embeddings, CHUNKS, top_k=1)
+    await knowledge_base.load()
+    assert await knowledge_base.search("Where is the gym") == [CHUNKS[1]]
+    assert await knowledge_base.search("  where IS the   gym ") == [CHUNKS[1]]
+    # One call for the chunks, one for the query
+    assert len(embeddings.calls) == 2
+
+@pytest.mark.asyncio
+async def test_search_falls_back_when_loading_fails(embeddings):
+    """Test that every chunk is returned if the chunks couldn't be embedded."""
+    embeddings.error = RuntimeError("embeddings unavailable")
+    knowledge_base = KnowledgeBase(embeddings, CHUNKS, top_k=1)
+    await knowledge_base.load()
+    assert await knowledge_base.search("Where is the gym") == CHUNKS
+
+@pytest.mark.asyncio
+async def test_search_falls_back_when_query_embedding_fails(embeddings):
+    """Test that every chunk is returned if the query couldn't be embedded."""
+    knowledge_base = KnowledgeBase(embeddings, CHUNKS, top_k=1)
+    await knowledge_base.load()
+    embeddings.error = RuntimeError("embeddings unavailable")
+    assert await knowledge_base.search("Where is the gym") == CHUNKS
+
+def test_build_chunks():
+    """Test splitting the hotel configuration into chunks."""
+    chunks = build_chunks({
+        "name": "Grand Hotel",
+        "address": "1 Main St",
+        "check_in_time": "3pm",
+        "check_out_time": "11am",
+        "amenities": ["pool", "gym"],
+        "room_types": {"standard": "Standard Room", "suite": "Suite"},
+        "policies": {"pets": "Not allowed"},
+    })
+    assert chunks == [
+        "Hotel name: Grand Hotel. Address: 1 Main St.",
+        "Check-in time is 3pm and check-out time is 11am.",
+        "Amenities: pool, gym.",
+        "Room types: Standard Room, Suite.",
+        "Pets policy: Not allowed.",
+    ]
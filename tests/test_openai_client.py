@@ -0,0 +1,61 @@
+"""
+Tests for the OpenAI client.
+"""
+from typing import List
+import pytest
+from pydantic import BaseModel
+from src.llm.base import LLMResponse, Message
+from src.llm.openai_client import OpenAIClient
+
+class Intent(BaseModel):
+    """Structured response used by the tests."""
+    intent: str
+    entities: List[str] = []
+
+MESSAGES = [Message(role="user", content="I want to book a room")]
+
+@pytest.fixture
+def llm_client(monkeypatch):
+    """Create a client whose chat completions are answered locally."""
+    client = OpenAIClient()
+    client.requests = []
+    
+    async def generate_response(messages, temperature=None, max_tokens=None, **kwargs):
+        client.requests.append(kwargs)
+        return LLMResponse(content='{"intent": "booking", "entities": ["room"]}')
+    
+    monkeypatch.setattr(client, "generate_response", generate_response)
+    return client
+
+@pytest.mark.asyncio
+async def test_structured_response_is_cached(llm_client):
+    """Test that an identical request is answered from the cache."""
+    first = await llm_client.generate_structured_response(MESSAGES, Intent)
+    second = await llm_client.generate_structured_response(MESSAGES, Intent)
+    assert first == second == Intent(intent="booking", entities=["room"])
+    assert len(llm_client.requests) == 1
+    
+    # A different request is not served the cached answer
+    await llm_client.generate_structured_response(MESSAGES, Intent, temperature=0.1)
+    assert len(llm_client.requests) == 2
+
+@pytest.mark.asyncio
+async def test_structured_cache_returns_copies(llm_client):
+    """Test that callers can't modify the cached response."""
+    first = await llm_client.generate_structured_response(MESSAGES, Intent)
+    first.entities.append("breakfast")
+    
+    second = await llm_client.generate_structured_response(MESSAGES, Intent)
+    assert second is not first
+    assert second.entities == ["room"]
+
+@pytest.mark.asyncio
+async def test_structured_request_options_bypass_cache(llm_client):
+    """Test that requests with extra options always reach the API."""
+    await llm_client.generate_structured_response(MESSAGES, Intent, seed=1)
+    await llm_client.generate_structured_response(MESSAGES, Intent, seed=1)
+    assert [request["seed"] for request in llm_client.requests] == [1, 1]
+    
+    # ...and don't populate the cache for plain requests either
+    await llm_client.generate_structured_response(MESSAGES, Intent)
+    assert len(llm_client.requests) == 3
@@ -0,0 +1,60 @@
+"""
+Performance guardrails for the hot validation paths.
+
+These run as part of a plain single-process pytest run; opt out with
+--benchmark-disable or --benchmark-skip. Without pytest-benchmark installed
+the module is skipped.
+"""
+import asyncio
+import pytest
+
+# Skip before the benchmark marks are applied; --strict-markers rejects them otherwise
+pytest.importorskip("pytest_benchmark")
+
+from datetime import datetime, timedelta
+from src.state_management import BookingDetails, validate_booking_details
+from src.instagram_client import InstagramClient
+
+pytestmark = pytest.mark.slow
+
+VALID_BOOKING = BookingDetails(
+    check_in_date=datetime.now() + timedelta(days=1),
+    check_out_date=datetime.now() + timedelta(days=3),
+    room_type="standard",
+    num_adults=2
+)
+VALID_WEBHOOK = {
+    "entry": [{
+        "messaging": [{
+            "sender": {"id": "user123"},
+            "message": {"text": "Hello"}
+        }]
+    }]
+}
+
+@pytest.fixture(autouse=True)
+def require_benchmarks(benchmark):
+    """Skip instead of asserting on missing stats when benchmarks are opted out."""
+    if benchmark.disabled:
+        pytest.skip("benchmarks are disabled")
+
+@pytest.fixture(scope="module")
+def instagram_client():
+    """Create one Instagram client instance shared by the benchmarks."""
+    client = InstagramClient()
+    yield client
+    asyncio.run(client.aclose())
+
+@pytest.mark.benchmark(group="validation", disable_gc=True)
+def test_bench_validate_booking_details(benchmark):
+    """Benchmark validating a complete booking."""
+    assert benchmark(validate_booking_details, VALID_BOOKING) == (True, "")
+    # Roughly 1us on a laptop; the margin absorbs noisy shared CI runners
+    assert benchmark.stats["mean"] < 5e-5
+
+@pytest.mark.benchmark(group="webhook", disable_gc=True)
+def test_bench_process_webhook(benchmark, instagram_client):
+    """Benchmark processing a text message webhook."""
+    assert benchmark(instagram_client.process_webhook, VALID_WEBHOOK) is not None
+    # Dominated by logging the received message
+    assert benchmark.stats["mean"] < 1e-3